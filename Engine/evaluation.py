@@ -1,4 +1,6 @@
-from board import Board, Move
+from board import Board, Move, PHASE_TOTAL
+from bitboard import (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KNIGHT_ATTACKS, bishop_attacks, rook_attacks,
+                      queen_attacks, pawn_attacks, popcount, iter_squares, FILE_BB)
 
 WHITE = True
 BLACK = False
@@ -11,25 +13,119 @@ ROOK_SEMI_OPEN_FILE_BONUS = 15
 
 MAX_MULT_BONUS = 0.6
 
+PAWN_TABLE_SIZE = 1 << 14 # Pawn hash entries, a power of two
+EVAL_CACHE_SIZE = 1 << 16 # Evaluation cache entries, a power of two
+
+# Centipawns per safe square a piece attacks, long range pieces gain less from each extra square
+MOBILITY_WEIGHTS = ((KNIGHT, 4), (BISHOP, 3), (ROOK, 2), (QUEEN, 1))
+
+class PawnHashTable:
+    # Direct-mapped cache of pawn structure terms keyed by Board.pawn_key
+    # Entry: (pawn key, score from white's view, white pawn file mask, black pawn file mask)
+    # Pawn structure changes on few moves, so almost every probe hits
+    def __init__(self, size=PAWN_TABLE_SIZE):
+        self.size = size
+        self.mask = size - 1
+        self.entries = [None] * size
+        self.reset_stats()
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, score, white_files, black_files):
+        entry = (key, score, white_files, black_files)
+        self.entries[key & self.mask] = entry
+        return entry
+
+    def clear(self):
+        self.entries = [None] * self.size
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+class EvalCache:
+    # Direct-mapped cache of static evaluations keyed by Board.hash_key
+    # The key includes the side to move, so the side-relative score is stored as is
+    def __init__(self, size=EVAL_CACHE_SIZE):
+        self.resize(size)
+
+    def resize(self, size):
+        # size is rounded down to a power of two entries
+        size = 1 << max(0, size.bit_length() - 1)
+        self.size = size
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.values = [0] * size
+        self.reset_stats()
+
+    def clear(self):
+        self.keys = [None] * self.size
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+pawn_table = PawnHashTable()
+eval_cache = EvalCache()
+
 def evaluate(board: Board, debug: bool) -> int:
-    score = board.eval
+    key = board.hash_key
+    cache = eval_cache
+    i = key & cache.mask
+    if cache.keys[i] == key:
+        cache.hits += 1
+        return cache.values[i]
+    cache.misses += 1
 
-    white_moves = board.get_pseudo_legal_moves(WHITE)
-    black_moves = board.get_pseudo_legal_moves(BLACK)
+    score = board.eval
 
-    # Relative Move Bonus
-    score += 2*(len(white_moves) - len(black_moves))
+    score += mobility(board, WHITE) - mobility(board, BLACK)
 
-    score += board.mg * king_safety(board)
+    score += king_safety(board) * min(board.phase, PHASE_TOTAL) // PHASE_TOTAL # Shield matters less as pieces come off
     score += file_bonuses(board)
 
     if board.turn % 2 != 0:  # Black to move
         score = -score
 
+    cache.keys[i] = key
+    cache.values[i] = score
     if debug:
         return score
     return score
 
+def mobility(board, colour):
+    # Piece-weighted count of attacked squares that are neither own pieces nor covered by enemy pawns
+    # Built from the attack tables, no moves are generated
+    pieces = board.pieceBB[colour]
+    occ = board.occupied
+    safe = ~(board.colourBB[colour] | pawn_attacks(board.pieceBB[not colour][PAWN], not colour))
+    score = 0
+    for kind, weight in MOBILITY_WEIGHTS:
+        for sq in iter_squares(pieces[kind]):
+            if kind == KNIGHT:
+                attacks = KNIGHT_ATTACKS[sq]
+            elif kind == BISHOP:
+                attacks = bishop_attacks(sq, occ)
+            elif kind == ROOK:
+                attacks = rook_attacks(sq, occ)
+            else:
+                attacks = queen_attacks(sq, occ)
+            score += weight * popcount(attacks & safe)
+    return score
+
 def king_safety(board):
     # Calculates king safety based on amount of pawns in front of king
     score = 0
@@ -43,7 +139,7 @@ def king_safety(board):
             x = kx + dx
             if 0 <= x < 8:
                 p = board.boardList[y][x]
-                if p and p.name == "pawn" and p.colour == WHITE:
+                if p and p.type == PAWN and p.colour == WHITE:
                     score += KING_PAWN_SHIELD_BONUS
                     if dx == 0:
                         score += 3
@@ -57,7 +153,7 @@ def king_safety(board):
             x = kx + dx
             if 0 <= x < 8:
                 p = board.boardList[y][x]
-                if p and p.name == "pawn" and p.colour == BLACK:
+                if p and p.type == PAWN and p.colour == BLACK:
                     score -= KING_PAWN_SHIELD_BONUS
                     if dx == 0:
                         score -= 3
@@ -65,49 +161,39 @@ def king_safety(board):
     return score
 
 def file_bonuses(board):
-    # Calculates Double Pawn Penalty, Bishop Pair Bonus and Open File for rooks bonuses
-    white_pawns_per_file = [0] * 8
-    black_pawns_per_file = [0] * 8
+    # Pawn structure from the pawn hash table, and open file bonuses for rooks from its file masks
+    _, score, white_files, black_files = pawn_structure(board)
 
-    white_rooks_per_file = [0] * 8
-    black_rooks_per_file = [0] * 8
+    for sq in iter_squares(board.pieceBB[WHITE][ROOK]):
+        file = 1 << (sq & 7)
+        if not white_files & file:
+            score += ROOK_SEMI_OPEN_FILE_BONUS if black_files & file else ROOK_OPEN_FILE_BONUS
 
-    white_bishops = 0
-    black_bishops = 0
+    for sq in iter_squares(board.pieceBB[BLACK][ROOK]):
+        file = 1 << (sq & 7)
+        if not black_files & file:
+            score -= ROOK_SEMI_OPEN_FILE_BONUS if white_files & file else ROOK_OPEN_FILE_BONUS
 
-    score = 0
+    return score
 
-    for p in board.whitePieces:
-        if p.name == "pawn":
-            white_pawns_per_file[p.pos[0]] += 1
-        elif p.name == "rook":
-            white_rooks_per_file[p.pos[0]] += 1
-        elif p.name == "bishop":
-            white_bishops += 1
-
-    for p in board.blackPieces:
-        if p.name == "pawn":
-            black_pawns_per_file[p.pos[0]] += 1
-        elif p.name == "rook":
-            black_rooks_per_file[p.pos[0]] += 1
-        elif p.name == "bishop":
-            black_bishops += 1
+def pawn_structure(board):
+    # Cached pawn terms for the current pawn placement, computed on a miss
+    entry = pawn_table.probe(board.pawn_key)
+    if entry is not None:
+        return entry
 
+    white_pawns = board.pieceBB[WHITE][PAWN]
+    black_pawns = board.pieceBB[BLACK][PAWN]
+    score = 0
+    white_files = black_files = 0
     for i in range(8):
-        wp = white_pawns_per_file[i]
-        bp = black_pawns_per_file[i]
-
-        if wp > 1:
+        wp = popcount(white_pawns & FILE_BB[i])
+        bp = popcount(black_pawns & FILE_BB[i])
+        if wp:
+            white_files |= 1 << i
             score += (wp - 1) * DOUBLED_PAWN_PENALTY
-        if bp > 1:
+        if bp:
+            black_files |= 1 << i
             score -= (bp - 1) * DOUBLED_PAWN_PENALTY
 
-        if wp == 0 and bp == 0:
-            score += white_rooks_per_file[i] * ROOK_OPEN_FILE_BONUS
-            score -= black_rooks_per_file[i] * ROOK_OPEN_FILE_BONUS
-        elif wp == 0:
-            score += white_rooks_per_file[i] * ROOK_SEMI_OPEN_FILE_BONUS
-        elif bp == 0:
-            score -= black_rooks_per_file[i] * ROOK_SEMI_OPEN_FILE_BONUS
-
-    return score
\ No newline at end of file
+    return pawn_table.store(board.pawn_key, score, white_files, black_files)
@@ -2,6 +2,8 @@
 # Higher values indicate better squares for pieces
 # Tables are from White's perspective (row 0 = rank 8, row 7 = rank 1)
 
+from bitboard import PIECE_INDEX
+
 PAWN_POS_BONUS = [
     [0, 0, 0, 0, 0, 0, 0, 0],
     [8, 8, 8, 8, 8, 8, 8, 8],
@@ -96,3 +98,17 @@ MIDDLEGAME_PIECE_SQUARE_TABLE = {
     "queen": QUEEN_POS_BONUS,
     "king": MIDDLEGAME_KING_POS_BONUS,
 }
+
+# Flat integer tables MIDDLEGAME_PST[colour][piece type][square] (and ENDGAME_PST), built once at import
+# Squares are y * 8 + x as on the board, white reads row 7 - y and black row y, and black's
+# entries are negated so every value is already from white's view
+def _expand(tables):
+    flat = [[None] * 6, [None] * 6]
+    for name, table in tables.items():
+        kind = PIECE_INDEX[name]
+        flat[1][kind] = [table[7 - (sq >> 3)][sq & 7] for sq in range(64)]
+        flat[0][kind] = [-table[sq >> 3][sq & 7] for sq in range(64)]
+    return flat
+
+MIDDLEGAME_PST = _expand(MIDDLEGAME_PIECE_SQUARE_TABLE)
+ENDGAME_PST = _expand(ENDGAME_PIECE_SQUARE_TABLE)
@@ -1,157 +1,462 @@
-from dataclasses import dataclass
-from Engine.evaluation import evaluate
-from board import Board, Move
+from Engine.evaluation import evaluate, eval_cache, pawn_table
+from Engine.transposition import TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER
+from Engine.timemanager import TimeManager
+from board import Board, MOVE_TYPE_MASK, MOVE_CASTLING, MOVE_PROMOTION, SEE_VALUES, move_to_uci
 import math
 import time
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait
+import random
 from piece import Piece
 
+MAX_PLY = 128
+MAX_DEPTH = 64 # Iteration limit when only time, nodes or a stop request end the search
+HISTORY_MAX = 50000 # History scores stay below the killer and capture bands in order_moves
+
+ASPIRATION_WINDOW = 50 # Initial half-width of the root window around the previous iteration's score
+MATE_THRESHOLD = 900000000 # Scores beyond this are mate scores and get a full window
+
+NULL_MOVE_MIN_DEPTH = 3
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3 # Moves searched at full depth before reductions start
+LMP_MAX_DEPTH = 3
+LMP_MOVE_COUNTS = [0, 6, 10, 16] # Quiet moves searched per remaining depth before the rest are pruned
+
+DELTA_MARGIN = 200 # Positional slack allowed on top of the captured material in quiescence
+
+POLL_NODES = 128 # The clock and the stop flags are checked once per this many nodes
+
+ROOT_SPLIT_BATCH = 4 # Root moves per root split task, small enough for later tasks to get a raised alpha
+
+# LMR_TABLE[depth][move_index] : plies to reduce a late quiet move by
+LMR_TABLE = [[0] * 64 for _ in range(64)]
+for _d in range(1, 64):
+    for _i in range(1, 64):
+        LMR_TABLE[_d][_i] = int(0.75 + math.log(_d) * math.log(_i) / 2.25)
+
 class SearchTimeout(Exception):
     # Raised when time-limit exceeds the deadline
     pass
 
 class SearchEngine:
-    def __init__(self, max_depth=None, max_time=None):
+    def __init__(self, max_depth=None, max_time=None, hash_mb=16, threads=1, root_workers=1,
+                 null_move_pruning=True, late_move_reductions=True, late_move_pruning=True, verbose=True,
+                 max_nodes=None):
         self.max_depth = max_depth
-        self.max_time = max_time
-        self._deadline = None
-        self.transposition_table : dict[bytes, TranspositionTableEntry] = {}
+        self.max_time = max_time # Fixed seconds per move
+        self.clock = None # (remaining, increment, moves_to_go) in seconds, the time manager budgets from it
+        self.max_nodes = max_nodes # Stop once this many nodes are searched, reproducible for benchmarks
+        self.time_manager = TimeManager()
+        self._stop_event = None # Shared stop flag while searching with Lazy SMP workers
+        self._stop_request = None # Caller's stop flag for the current search, see choose_move
+        self._pondering = False # Searching on the opponent's time, the clock starts at ponderhit
+        self.verbose = verbose # Print search statistics, off for front ends that own stdout
+        self.on_iteration = None # Called with (depth, value, pv) after every completed iteration
+        self.threads = threads
+        self.root_workers = root_workers # Processes splitting the root moves in fixed-depth searches, 1 for off
+        self._pool = None
+        self._pool_table = None # Name of the shared table the pool workers are attached to
+        self._pool_stop = None # Stops the pool workers' running searches
+        self._prepared = False # prepare_search already armed the next choose_move
+
+        # More than one thread or root worker shares the table with the worker processes
+        if threads > 1 or root_workers > 1:
+            self.transposition_table = SharedTranspositionTable(hash_mb)
+        else:
+            self.transposition_table = TranspositionTable(hash_mb)
         self.nodes = 0
 
-    def choose_move(self, board):
+        # Selectivity switches, turn off to compare node counts against the full-width search
+        self.null_move_pruning = null_move_pruning
+        self.late_move_reductions = late_move_reductions
+        self.late_move_pruning = late_move_pruning
+
+        # Quiet move ordering heuristics
+        self.killers = [[0, 0] for _ in range(MAX_PLY)] # Two quiet moves per ply that caused a beta cutoff
+        self.history = [[0] * 4096, [0] * 4096] # Butterfly table [colour][from * 64 + to]
+        self.counter_moves = [0] * 4096 # Quiet reply that refuted the previous move [from * 64 + to]
+        self._move_stack = [0] * MAX_PLY # Move played at each ply of the current line
+
+        # Triangular PV table: pv_table[ply] holds the best line found from that ply
+        self.pv_table = [[0] * MAX_PLY for _ in range(MAX_PLY + 1)]
+        self.pv_length = [0] * (MAX_PLY + 1)
+        self.pv = [] # Principal variation of the last completed iteration
+
+    def prepare_search(self, stop=None, ponder=False):
+        # stop is an optional threading.Event another thread sets to end the search early,
+        # the best move of the deepest completed iteration is still returned
+        # ponder searches the position after the expected reply without a time limit until ponderhit
+        # Front ends that search on a worker thread call this before starting it, so a ponderhit
+        # that arrives before choose_move runs is not overwritten
+        self._stop_request = stop
+        self._pondering = ponder
+        self.time_manager.start(self.max_time, self.clock)
+        self._prepared = True
+
+    def choose_move(self, board, stop=None, ponder=False):
+        # stop and ponder are passed on to prepare_search unless it was already called for this search
+        if not self._prepared:
+            self.prepare_search(stop, ponder)
+        self._prepared = False
         self.nodes = 0
+        self.transposition_table.new_search()
+        self.transposition_table.reset_stats()
+        eval_cache.reset_stats()
+        pawn_table.reset_stats()
+        self._age_heuristics()
         start_time = time.perf_counter()
 
-        if self.max_time is not None:
+        if self.threads > 1:
+            result = self.lazy_smp_search(board)
+        elif self.time_manager.limited:
             result = self.iterative_deepening_time(board)
         else:
             result = self.iterative_deepening(board)
 
         end_time = time.perf_counter()
         duration = end_time - start_time
+        self._stop_request = None
+        self._pondering = False
 
         # Calculate NPS (avoid division by zero)
         nps = self.nodes / duration if duration > 0 else 0
-        print(f"Nodes: {self.nodes}")
-        print(f"Time: {duration:.2f}s")
-        print(f"NPS: {int(nps)} ({int(nps / 1000)} kN/s)")
+        self._log(f"Nodes: {self.nodes}")
+        self._log(f"Time: {duration:.2f}s")
+        self._log(f"NPS: {int(nps)} ({int(nps / 1000)} kN/s)")
+        tt = self.transposition_table
+        self._log(f"TT: {tt.hit_rate():.1%} hits, {tt.collisions} collisions, hashfull {tt.hashfull()}")
+        self._log(f"Eval cache: {eval_cache.hit_rate():.1%} hits ({eval_cache.hits} hits, {eval_cache.misses} misses), "
+                  f"pawn table: {pawn_table.hit_rate():.1%} hits")
+        self._log(f"PV: {' '.join(move_to_uci(m) for m in self.pv)}")
 
         return result
 
-    def negamax(self, board: Board, depth, alpha, beta, ply):
-        # Negamax search with alpha-beta pruning and transposition table
+    def ponderhit(self):
+        # The expected reply was played: the running ponder search becomes the real search,
+        # keeping its completed iterations, and the time limits start counting from now
+        self.time_manager.restart()
+        self._pondering = False
+
+    def _log(self, text):
+        if self.verbose:
+            print(text)
+
+    def resize_hash(self, hash_mb):
+        self.transposition_table.resize(hash_mb)
+
+    def resize_eval_cache(self, entries):
+        # Static evaluation cache size in entries, rounded down to a power of two
+        eval_cache.resize(entries)
+
+    def set_threads(self, threads):
+        self.threads = threads
+        self._share_table()
+
+    def set_root_workers(self, root_workers):
+        self.root_workers = root_workers
+        self._share_table()
+
+    def _share_table(self):
+        # Lazy SMP and the root split need the table in shared memory, a single process keeps the plain one
+        want = self.threads > 1 or self.root_workers > 1
+        shared = isinstance(self.transposition_table, SharedTranspositionTable)
+        if want != shared:
+            size_mb = self.transposition_table.size_mb
+            if shared:
+                self.transposition_table.close()
+            self.transposition_table = SharedTranspositionTable(size_mb) if want else TranspositionTable(size_mb)
+
+    def new_game(self):
+        # Forget everything learned from the previous game
+        self._reset_search_state()
+        eval_cache.clear()
+        pawn_table.clear()
+
+    def _reset_search_state(self):
+        # Empty table and move ordering heuristics
+        self.transposition_table.clear()
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        self.history = [[0] * 4096, [0] * 4096]
+        self.counter_moves = [0] * 4096
+
+    def negamax(self, board: Board, depth, alpha, beta, ply, allow_null=True):
+        # Negamax search with alpha-beta pruning, principal variation search and transposition table
 
         self._check_time()
+        self.pv_length[ply] = 0
         alpha0 = alpha
-        key = board.position_key()
+        key = board.hash_key
 
-        entry = self.transposition_table.get(key)
+        entry = self.transposition_table.probe(key)
+        tt_move = entry[3] if entry is not None else 0
 
         # Check transposition table
-        if entry is not None and entry.depth >= depth:
-            if entry.flag == "EXACT":
-                return entry.value
-            elif entry.flag == "LOWER":
-                alpha = max(alpha, entry.value)
-            elif entry.flag == "UPPER":
-                beta = min(beta, entry.value)
+        if entry is not None and entry[0] >= depth:
+            tt_depth, tt_bound, tt_value, tt_move = entry
+            if tt_bound == EXACT:
+                return tt_value
+            elif tt_bound == LOWER:
+                alpha = max(alpha, tt_value)
+            elif tt_bound == UPPER:
+                beta = min(beta, tt_value)
             if alpha >= beta:
-                return entry.value
+                return tt_value
 
         # At leaf nodes use quiescence search instead
         if depth == 0:
             return self.quiescence_search(board, alpha, beta, ply)
 
-        childMoves = board.get_pseudo_legal_moves(board.turn%2==0)
-        best_move = None
+        side = board.turn % 2 == 0
+        in_check = board.in_check(side)
+        pv_node = beta - alpha > 1
+
+        # Null-move pruning: if passing still fails high the position is good enough to cut
+        # Skipped in check, at PV nodes and with only pawns left where zugzwang is likely
+        if (self.null_move_pruning and allow_null and not pv_node and not in_check
+                and depth >= NULL_MOVE_MIN_DEPTH and abs(beta) < MATE_THRESHOLD
+                and (board.eval if side else -board.eval) >= beta
+                and board.has_non_pawn_material(side)):
+            R = 3 if depth > 6 else 2
+            self._move_stack[ply] = 0
+            board.make_null_move()
+            try:
+                score = -self.negamax(board, max(0, depth - 1 - R), -beta, -beta + 1, ply + 1, False)
+                board.undo_null_move()
+            except:
+                board.undo_null_move()
+                raise
+            if score >= beta:
+                # Mate scores found behind a null move are not proven
+                return beta if score >= MATE_THRESHOLD else score
 
-        childMoves = self.order_moves(childMoves)
+        # Out of check the moves come from the staged picker, evasions are few enough to sort at once
+        if in_check:
+            childMoves = self.order_moves(board, board.generate_legal_moves(side), tt_move, ply)
+        else:
+            childMoves = self.staged_moves(board, tt_move, ply)
+
+        best_move = None
         value = -math.inf
-        legal_move_found = False
 
-        for move in childMoves:
+        # Late moves are only reduced or pruned at quiet, non-PV nodes away from mate scores
+        selective = not in_check and abs(alpha) < MATE_THRESHOLD
+        killer1, killer2 = self.killers[ply]
+        quiets = 0
+
+        for i, move in enumerate(childMoves):
+
+            quiet = (move & MOVE_TYPE_MASK <= MOVE_CASTLING and move != tt_move
+                     and move != killer1 and move != killer2)
+            if quiet:
+                quiets += 1
+
+            # Late move pruning: at shallow depth skip quiet moves far down the ordering
+            if (self.late_move_pruning and quiet and selective and not pv_node
+                    and depth <= LMP_MAX_DEPTH and quiets > LMP_MOVE_COUNTS[depth]
+                    and value > -MATE_THRESHOLD):
+                continue
 
             self.nodes += 1
+            self._move_stack[ply] = move
             board._apply_temp_move(move)
 
             try:
-                # Skip illegal moves, (king in check)
-                if board.in_check(board.turn%2==1):
-                    board._undo_temp_move(move)
-                    continue
-
-                legal_move_found = True
-
                 # draw checks
-                if board.moveRuleTurns >= 50 or board.position_counts[board.position_key()] >= 3:
-                    board._undo_temp_move(move)
-
-                    if 0 > value:
-                        value = 0
-                        best_move = move
-                    continue
-
-                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+                if board.moveRuleTurns >= 50 or board.position_counts[board.hash_key] >= 3:
+                    score = 0
+                    self.pv_length[ply + 1] = 0
+                elif i == 0:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    # Late move reductions: quiet moves late in the ordering get a shallower null-window search
+                    reduction = 0
+                    if (self.late_move_reductions and quiet and selective and depth >= LMR_MIN_DEPTH
+                            and i >= LMR_MIN_MOVES and not board.in_check(not side)):
+                        reduction = LMR_TABLE[min(depth, 63)][min(i, 63)]
+                        if pv_node:
+                            reduction -= 1
+                        reduction = max(0, min(reduction, depth - 2))
+
+                    # Later moves only need to prove they are no better than alpha
+                    score = -self.negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)
+                    if reduction and score > alpha:
+                        score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < score < beta:
+                        score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
                 board._undo_temp_move(move)
-
-                if score > value:
-                    value = score
-                    best_move = move
-
-                alpha = max(alpha, value)
-
-                # Beta cutoff
-                if alpha >= beta:
-                    break
             except:
                 board._undo_temp_move(move)
                 raise
 
+            if score > value:
+                value = score
+                best_move = move
+
+            if value > alpha:
+                alpha = value
+                self._update_pv(ply, move)
+
+            # Beta cutoff
+            if alpha >= beta:
+                if move & MOVE_TYPE_MASK <= MOVE_CASTLING:
+                    self._update_quiet_heuristics(board, move, depth, ply)
+                break
+
         # No legal moves : Stalemate or Checkmate
-        if not legal_move_found:
-            if board.in_check(board.turn % 2 == 0):
+        if best_move is None:
+            if in_check:
                 return -1000000000 + ply  # Checkmate (ply for preferring faster mates)
             else:
                 return 0 # Stalemate
 
         # store in transposition table
         if value <= alpha0:
-            flag = "UPPER"
+            bound = UPPER
         elif value >= beta:
-            flag = "LOWER"
+            bound = LOWER
         else:
-            flag = "EXACT"
+            bound = EXACT
 
         if best_move is not None:
-            self.transposition_table[key] = TranspositionTableEntry(depth=depth, value=value, flag=flag, best_move=best_move)
+            self.transposition_table.store(key, depth, bound, value, best_move)
 
         return value
 
-    def order_moves(self, moves):
-        # Sort moves for better alpha - beta pruning, (captures first)
+    def _update_pv(self, ply, move):
+        # The line from this ply is the move followed by the child's line
+        pv = self.pv_table[ply]
+        n = self.pv_length[ply + 1]
+        pv[0] = move
+        pv[1:n + 1] = self.pv_table[ply + 1][:n]
+        self.pv_length[ply] = n + 1
+
+    def order_moves(self, board, moves, tt_move=0, ply=None):
+        # Sort moves for better alpha - beta pruning: hash move, promotions, winning captures (MVV-LVA),
+        # killers, counter move, castling, quiet moves by history score, then losing captures by SEE
+        return sorted(moves, key=self._move_scorer(board, tt_move, ply), reverse=True)
+
+    def _move_scorer(self, board, tt_move=0, ply=None):
+        # Sort key shared by order_moves and the staged move picker, losing captures score below zero
+        boardList = board.boardList
+
+        killer1 = killer2 = counter = 0
+        history = self.history[board.turn % 2 == 0]
+        if ply is not None:
+            killer1, killer2 = self.killers[ply]
+            if ply > 0 and self._move_stack[ply - 1]:
+                prev = self._move_stack[ply - 1]
+                counter = self.counter_moves[prev & 0xFFF]
 
         def abs_worth(p: Piece):
-            return abs(p.piece_worth()) if p else 0
+            return abs(p.value) if p else 0
+
+        def score_moves(m: int):
+            if m == tt_move:
+                return 100000000
+
+            t = (m >> 12) & 7
 
-        def score_moves(m: Move):
-            t = m.typeOfMove
+            if t >= 2:
+                to_sq = (m >> 6) & 63
+                attacker = abs_worth(boardList[(m & 63) >> 3][m & 7])
+                victim_or_promo = abs_worth(boardList[to_sq >> 3][to_sq & 7])
 
-            attacker = abs_worth(m.piece)
-            victim_or_promo = abs_worth(m.piece2)
+                if t == 3: # Promotion
+                    return 10000000 + victim_or_promo
 
-            if t == 3: # Promotion
-                return 10000000 + victim_or_promo
+                if t == 2: # En passant always takes a pawn
+                    return 500000 + 100 * 10 - attacker
+
+                # Capturing a more valuable piece never loses material, otherwise ask SEE
+                if attacker > victim_or_promo:
+                    see = board.see(m)
+                    if see < 0:
+                        return -1000000 + see
 
-            if t == 2 or t == 4:
                 # Most Valuable Victim - Least Valuable Attacker
                 mvv_lva = victim_or_promo * 10 - attacker
                 return 500000 + mvv_lva
 
+            if m == killer1:
+                return 400000
+            if m == killer2:
+                return 390000
+            if m == counter:
+                return 380000
+
             if t == 1: # Castling
                 return 100000
 
-            return 0
+            return history[m & 0xFFF]
+
+        return score_moves
 
-        return sorted(moves, key=score_moves, reverse=True)
+    def staged_moves(self, board, tt_move, ply):
+        # Yields legal moves stage by stage so a cutoff skips generating and sorting the later stages:
+        # hash move, winning captures and promotions, killers and counter move, quiets by history,
+        # then losing captures
+        side = board.turn % 2 == 0
+        if tt_move and board.is_legal_move(tt_move):
+            yield tt_move
+        else:
+            tt_move = 0
+
+        score = self._move_scorer(board, 0, ply)
+        losing = []
+        # Score each capture once, SEE is too costly to run again when splitting off the losing ones
+        capture_scores = {move: score(move) for move in board.generate_legal_captures(side)}
+        for move in sorted(capture_scores, key=capture_scores.__getitem__, reverse=True):
+            if move == tt_move:
+                continue
+            if capture_scores[move] < 0:
+                losing.append(move)
+            else:
+                yield move
+
+        quiets = board.generate_legal_quiets(side)
+        done = {tt_move}
+        killer1, killer2 = self.killers[ply]
+        counter = 0
+        if ply > 0 and self._move_stack[ply - 1]:
+            counter = self.counter_moves[self._move_stack[ply - 1] & 0xFFF]
+        for move in (killer1, killer2, counter):
+            if move and move not in done and move in quiets:
+                done.add(move)
+                yield move
+
+        for move in sorted(quiets, key=score, reverse=True):
+            if move not in done:
+                yield move
+
+        yield from losing
+
+    def _update_quiet_heuristics(self, board, move, depth, ply):
+        # A quiet move caused a beta cutoff: remember it as a killer, counter move and in history
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        if ply > 0 and self._move_stack[ply - 1]:
+            self.counter_moves[self._move_stack[ply - 1] & 0xFFF] = move
+
+        history = self.history[board.turn % 2 == 0]
+        i = move & 0xFFF
+        history[i] += depth * depth
+        if history[i] > HISTORY_MAX:
+            for table in self.history:
+                for j in range(4096):
+                    table[j] >>= 1
+
+    def _age_heuristics(self):
+        # Killers are position specific, history is halved so older searches weigh less
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        for table in self.history:
+            for j in range(4096):
+                table[j] >>= 1
 
     def quiescence_search(self, board, alpha, beta, ply):
         # Search only tactical moves till the position is stabilized
@@ -165,21 +470,33 @@ class SearchEngine:
         if stand_pat > alpha:
             alpha = stand_pat
 
-        moves = board.get_pseudo_legal_moves(board.turn%2==0)
+        # Delta pruning: even winning a queen cannot lift the score to alpha
+        if stand_pat + SEE_VALUES[4] + DELTA_MARGIN < alpha:
+            return alpha
 
         # Search only promotions, captures and en-passant
-        tactical = [m for m in moves if m.typeOfMove in (2,3,4)]
-        tactical = self.order_moves(tactical)
+        score = self._move_scorer(board)
+        tactical = {move: score(move) for move in board.generate_legal_captures(board.turn%2==0)}
+        boardList = board.boardList
+
+        # Captures and promotions that lose material in the exchange cannot raise alpha
+        for move in sorted(tactical, key=tactical.__getitem__, reverse=True):
+            if move & MOVE_TYPE_MASK != MOVE_PROMOTION:
+                # Delta pruning per capture against the value of the victim
+                to_sq = (move >> 6) & 63
+                victim = boardList[to_sq >> 3][to_sq & 7]
+                gain = abs(victim.value) if victim else SEE_VALUES[0]
+                if stand_pat + gain + DELTA_MARGIN <= alpha:
+                    continue
+                # The ordering score already ran SEE where it can be negative and put losing captures below zero
+                if tactical[move] < 0:
+                    continue
+            elif board.see(move) < 0:
+                continue
 
-        for move in tactical:
             self.nodes += 1
             board._apply_temp_move(move)
             try:
-
-                if board.in_check(board.turn%2==1):
-                    board._undo_temp_move(move)
-                    continue
-
                 score = -self.quiescence_search(board, -beta, -alpha, ply + 1)
                 board._undo_temp_move(move)
 
@@ -196,107 +513,406 @@ class SearchEngine:
 
     def iterative_deepening(self, board):
         # Search Progressively Deeper till max depth reached
+        # Root splitting needs a fixed depth, node limits run the serial search
+        if self.root_workers > 1 and self.max_depth and not self.max_nodes:
+            return self.root_split_search(board)
+        return self._iterate(board, self.max_depth or MAX_DEPTH)
+
+    def _iterate(self, board, max_depth):
+        # Iterative deepening loop shared by the depth and time modes, stops early on the
+        # deadline, node limit or a stop request and keeps the deepest completed result
+        root_moves = board.generate_legal_moves(board.turn % 2 == 0)
+        if not root_moves:
+            self._log(f"Evaluation: No legal moves (checkmate/stalemate)")
+            return None
 
-        best_move = None
-        best_value = -math.inf
+        best_move = root_moves[0]  # fallback if not even depth 1 completes
+        best_value = 0
+        self.pv = [best_move]
 
-        for depth in range(1, self.max_depth + 1):
-            value, move = self._search_root(board, depth)
-            if move is not None:
-                best_move = move
-                best_value = value
+        for depth, value, pv in self._deepen(board, 1, max_depth):
+            best_move, best_value = pv[0], value
+            self.pv = pv
+            if self.on_iteration is not None:
+                self.on_iteration(depth, value, pv)
 
         # Print evaluation from white's perspective
-        if best_move is not None:
-            best_value = best_value if board.turn % 2 == 0 else -best_value
-            print(f"Evaluation: {best_value}")
-        else:
-            print(f"Evaluation: No legal moves (checkmate/stalemate)")
-
+        best_value = best_value if board.turn % 2 == 0 else -best_value
+        self._log(f"Evaluation: {best_value}")
         return best_move
 
-    def _search_root(self, board, depth):
-        # Search from root position
+    def _aspiration_search(self, board, depth, previous):
+        # Search the root in a narrow window around the previous iteration's score,
+        # widening the side that failed until the score lands inside the window
+        if depth < 3 or abs(previous) >= MATE_THRESHOLD:
+            return self._search_root(board, depth, -math.inf, math.inf)
+
+        delta = ASPIRATION_WINDOW
+        alpha = previous - delta
+        beta = previous + delta
+        while True:
+            value, pv = self._search_root(board, depth, alpha, beta)
+            if value <= alpha:
+                alpha = previous - delta * 2 if delta < 1000 else -math.inf
+            elif value >= beta:
+                beta = previous + delta * 2 if delta < 1000 else math.inf
+            else:
+                return value, pv
+            delta *= 2
+
+    def _search_root(self, board, depth, alpha=-math.inf, beta=math.inf):
+        # Search from root position, returns the score and the principal variation
 
         self._check_time()
         best_move = None
         best_value = -math.inf
+        alpha0 = alpha
+        self.pv_length[0] = 0
 
-        alpha = -math.inf
-        beta = math.inf
+        moves = board.generate_legal_moves(board.turn%2==0)
+        if not moves:
+            return -math.inf, []
 
-        moves = board.get_pseudo_legal_moves(board.turn%2==0)
-        moves = self.order_moves(moves)
+        entry = self.transposition_table.probe(board.hash_key)
+        moves = self.order_moves(board, moves, entry[3] if entry is not None else 0, 0)
 
-        legal_move_found = False
-        for move in moves:
+        for i, move in enumerate(moves):
+            self.nodes += 1
+            self._move_stack[0] = move
             board._apply_temp_move(move)
             try:
-                if board.in_check(board.turn%2==1):
-                    board._undo_temp_move(move)
-                    continue
-                value = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+                if i == 0:
+                    value = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+                else:
+                    value = -self.negamax(board, depth - 1, -alpha - 1, -alpha, 1)
+                    if alpha < value < beta:
+                        value = -self.negamax(board, depth - 1, -beta, -alpha, 1)
                 board._undo_temp_move(move)
-                legal_move_found = True
-                if value > best_value:
-                    best_value = value
-                    best_move = move
-
-                alpha = max(alpha, best_value)
             except:
                 board._undo_temp_move(move)
                 raise
 
-        if not legal_move_found:
-            return -math.inf, None
+            if value > best_value:
+                best_value = value
+                best_move = move
+
+            if value > alpha:
+                alpha = value
+                self._update_pv(0, move)
+                if alpha >= beta:
+                    break
+
+        # Root result seeds the next iteration's move ordering
+        if best_value <= alpha0:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.transposition_table.store(board.hash_key, depth, bound, best_value, best_move)
 
-        return best_value, best_move
+        pv = self.pv_table[0][:self.pv_length[0]] or [best_move]
+        return best_value, pv
 
     def _check_time(self):
-        if not self.max_time:
+        if self.max_nodes and self.nodes >= self.max_nodes:
+            raise SearchTimeout()
+        if self.nodes % POLL_NODES:
             return
-        if time.perf_counter() >= self._deadline:
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise SearchTimeout()
+        if self._stop_request is not None and self._stop_request.is_set():
+            raise SearchTimeout()
+        if not self._pondering and self.time_manager.hard_expired():
             raise SearchTimeout()
 
     def iterative_deepening_time(self, board):
-        # Search progressively deeper until time limit reached
+        # Search progressively deeper until the time manager stops it, see choose_move
+        return self._iterate(board, self.max_depth or MAX_DEPTH)
+
+    def _deepen(self, board, start_depth, max_depth):
+        # Yields (depth, value, pv) after each completed iteration until max depth, the time limits or a stop
+        # An iteration is only started while the time manager expects it to finish
+        value = -math.inf
+        tm = self.time_manager
+        for depth in range(start_depth, max_depth + 1):
+            if depth > start_depth and not self._pondering and not tm.should_start_iteration():
+                return
+            try:
+                value_d, pv = self._aspiration_search(board, depth, value)
+            except SearchTimeout:
+                return
+            if pv:
+                value = value_d
+                tm.iteration_done(depth, pv[0], value)
+                yield depth, value, pv
+
+    def lazy_smp_search(self, board):
+        # Lazy SMP: helper processes run the same iterative deepening on copies of the board and
+        # feed the shared transposition table; the deepest completed iteration of any process wins
         root_moves = board.generate_legal_moves(board.turn % 2 == 0)
         if not root_moves:
+            self._log(f"Evaluation: No legal moves (checkmate/stalemate)")
             return None
 
-        start = time.perf_counter()
-        self._deadline = start + float(self.max_time)
-
-        best_move = root_moves[0]  # fallback
-        best_value = -math.inf
-
-        depth = 1
-        while True:
+        max_depth = self.max_depth or MAX_DEPTH
+
+        stop = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        config = {
+            "max_depth": max_depth,
+            # Helpers get the hard limit and otherwise stop with the main search, which also covers a ponderhit
+            "max_time": None if self._pondering else self.time_manager.hard,
+            "max_nodes": self.max_nodes,
+            "hash_mb": self.transposition_table.size_mb,
+            "table": self.transposition_table.name,
+            "generation": self.transposition_table.generation,
+            "switches": (self.null_move_pruning, self.late_move_reductions, self.late_move_pruning),
+        }
+        workers = [multiprocessing.Process(target=_smp_worker, args=(board, config, i, stop, results), daemon=True)
+                   for i in range(1, self.threads)]
+        for w in workers:
+            w.start()
+
+        best_depth, best_value, best_pv = 0, 0, [root_moves[0]]
+        self._stop_event = stop
+        try:
+            for depth, value, pv in self._deepen(board, 1, max_depth):
+                best_depth, best_value, best_pv = depth, value, pv
+                if self.on_iteration is not None:
+                    self.on_iteration(depth, value, pv)
+        finally:
+            stop.set()
+            self._stop_event = None
+
+        # Collect helper results, a helper only replaces the main line by finishing a deeper iteration
+        done = 0
+        while done < len(workers):
             try:
-                value_d, move_d = self._search_root(board, depth)
-
-                if move_d is not None:
-                    best_move, best_value = move_d, value_d
-
-                depth += 1
+                message = results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(w.is_alive() for w in workers):
+                    break
+                continue
+            if message[0] is None:
+                done += 1
+                self.nodes += message[1]
+            elif message[0] > best_depth:
+                best_depth, best_value, best_pv = message
+        for w in workers:
+            w.join()
+
+        self.pv = best_pv
+        best_value = best_value if board.turn % 2 == 0 else -best_value
+        self._log(f"Evaluation: {best_value} (depth {best_depth}, {self.threads} threads)")
+        return best_pv[0]
+
+    def root_split_search(self, board):
+        # Fixed-depth search whose last iteration is spread over root_workers processes
+        # Everything up to the first root move of the last iteration is the serial search; the other
+        # root moves go to the pool in small batches that start from the serial engine's table (shared)
+        # and move ordering heuristics, each batch with the best score completed so far as alpha
+        # Batches run side by side instead of one after another, so a close second choice can be
+        # played where the serial search would not, see splitcheck.py
+        moves = board.generate_legal_moves(board.turn % 2 == 0)
+        if not moves:
+            self._log(f"Evaluation: No legal moves (checkmate/stalemate)")
+            return None
 
-                if depth > 64:
-                     break
+        depth = self.max_depth
+        best_value = 0
+        self.pv = [moves[0]]
+        completed = 0
+        for completed, best_value, pv in self._deepen(board, 1, depth - 1):
+            self.pv = pv
+            if self.on_iteration is not None:
+                self.on_iteration(completed, best_value, pv)
 
+        if completed == depth - 1:
+            try:
+                best_value, self.pv = self._split_last_iteration(board, depth, best_value)
+                if self.on_iteration is not None:
+                    self.on_iteration(depth, best_value, self.pv)
             except SearchTimeout:
-                break
-
-        if best_move is not None:
-            best_value = best_value if board.turn % 2 == 0 else -best_value
-            print(f"Evaluation: {best_value}")
-        else:
-            print(f"Evaluation: No legal moves (checkmate/stalemate)")
+                pass # Stopped during the split, keep the last completed iteration
 
-        return best_move
+        value = best_value if board.turn % 2 == 0 else -best_value
+        self._log(f"Evaluation: {value}")
+        return self.pv[0]
 
-@dataclass
-class TranspositionTableEntry:
-    depth: int
-    value: int
-    flag: str # "EXACT", "LOWER", "UPPER"
-    best_move: object | None
\ No newline at end of file
+    def _split_last_iteration(self, board, depth, previous):
+        # Root search at depth with the moves after the first one scored by the pool,
+        # returns the score and principal variation like _search_root
+        self._check_time()
+        self.pv_length[0] = 0
+        entry = self.transposition_table.probe(board.hash_key)
+        moves = self.order_moves(board, board.generate_legal_moves(board.turn % 2 == 0),
+                                 entry[3] if entry is not None else 0, 0)
+
+        # The first move is searched as in _aspiration_search, its exact score is alpha for the rest
+        value = self._search_first_root_move(board, moves[0], depth, previous)
+        best_value, best_pv = value, [moves[0]] + self.pv_table[1][:self.pv_length[1]]
+
+        rest = moves[1:]
+        batches = [rest[i:i + ROOT_SPLIT_BATCH] for i in range(0, len(rest), ROOT_SPLIT_BATCH)]
+        state = {
+            "switches": (self.null_move_pruning, self.late_move_reductions, self.late_move_pruning),
+            "generation": self.transposition_table.generation,
+            "killers": self.killers,
+            "history": self.history,
+            "counter_moves": self.counter_moves,
+        }
+        scores = self._search_root_batches(board, batches, depth, best_value, state)
+
+        # Only scores above the alpha a move was searched with are exact, ties keep the earlier move
+        for move_value, pv, exact in scores:
+            if exact and move_value > best_value:
+                best_value, best_pv = move_value, pv
+
+        # Root result seeds the next search's move ordering
+        self.transposition_table.store(board.hash_key, depth, EXACT, best_value, best_pv[0])
+        return best_value, best_pv
+
+    def _search_first_root_move(self, board, move, depth, previous):
+        # Score of the first root move, in a window around the previous iteration's score that
+        # widens on the side that failed
+        alpha, beta, delta = -math.inf, math.inf, ASPIRATION_WINDOW
+        if depth >= 3 and abs(previous) < MATE_THRESHOLD:
+            alpha, beta = previous - delta, previous + delta
+        self.nodes += 1
+        self._move_stack[0] = move
+        board._apply_temp_move(move)
+        try:
+            while True:
+                value = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+                if value <= alpha:
+                    alpha = previous - delta * 2 if delta < 1000 else -math.inf
+                elif value >= beta:
+                    beta = previous + delta * 2 if delta < 1000 else math.inf
+                else:
+                    return value
+                delta *= 2
+        finally:
+            board._undo_temp_move(move)
+
+    def _search_root_batches(self, board, batches, depth, alpha, state):
+        # Score the batches in the process pool, returns [(value, pv, exact)] in root order
+        # At most root_workers batches are queued, each new one gets the best exact score so far as alpha
+        # Raises SearchTimeout when a stop request arrives before every batch is done
+        table = self.transposition_table
+        if self._pool is not None and self._pool_table != table.name:
+            self.close() # The table was replaced or resized, the workers hold the old one
+        if self._pool is None:
+            self._pool_stop = multiprocessing.Event()
+            self._pool = ProcessPoolExecutor(max_workers=self.root_workers, initializer=_init_root_worker,
+                                             initargs=(table.name, table.size_mb, self._pool_stop))
+            self._pool_table = table.name
+
+        results = [None] * len(batches)
+        running = {}
+        next_batch = 0
+        stopped = False
+        while next_batch < len(batches) or running:
+            while not stopped and next_batch < len(batches) and len(running) < self.root_workers:
+                future = self._pool.submit(_run_root_batch, board, batches[next_batch], depth, alpha, state)
+                running[future] = next_batch
+                next_batch += 1
+
+            done, _ = wait(running, timeout=0.05)
+            for future in done:
+                scores, nodes = future.result()
+                self.nodes += nodes
+                results[running.pop(future)] = scores
+                for value, pv, exact in scores or ():
+                    if exact:
+                        alpha = max(alpha, value)
+
+            if not stopped and self._stop_request is not None and self._stop_request.is_set():
+                # Running batches notice the flag within POLL_NODES nodes
+                stopped = True
+                next_batch = len(batches)
+                self._pool_stop.set()
+
+        if stopped:
+            self._pool_stop.clear()
+            raise SearchTimeout()
+        return [score for scores in results for score in scores]
+
+    def close(self):
+        # Shut down the root split process pool, it is recreated if another split search runs
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_table = None
+
+def _search_root_moves(engine, board, moves, depth, alpha):
+    # Score root moves from the root side's view as [(value, pv, exact)]
+    # Each move gets a null window that is re-searched for the exact score when it beats alpha,
+    # alpha rises as moves beat it; a score at or below the alpha it was searched with is only a bound
+    results = []
+    for move in moves:
+        engine.nodes += 1
+        engine._move_stack[0] = move
+        board._apply_temp_move(move)
+        try:
+            value = -engine.negamax(board, depth - 1, -alpha - 1, -alpha, 1)
+            if value > alpha:
+                value = -engine.negamax(board, depth - 1, -math.inf, -alpha, 1)
+        finally:
+            board._undo_temp_move(move)
+        exact = value > alpha
+        results.append((value, [move] + engine.pv_table[1][:engine.pv_length[1]], exact))
+        if exact:
+            alpha = value
+    return results
+
+_root_worker_engine = None # Per-process engine reused by every batch a pool worker runs
+
+def _init_root_worker(table, hash_mb, stop):
+    # Pool initializer: one engine per worker process, attached to the main engine's shared table
+    global _root_worker_engine
+    engine = SearchEngine(hash_mb=0, verbose=False)
+    engine.transposition_table = SharedTranspositionTable(hash_mb, name=table)
+    engine._stop_event = stop
+    _root_worker_engine = engine
+
+def _run_root_batch(board, moves, depth, alpha, state):
+    # Process pool task: score a batch of root moves starting from the main engine's heuristics,
+    # returns (scores, nodes) with scores None when the search was stopped
+    engine = _root_worker_engine
+    engine.null_move_pruning, engine.late_move_reductions, engine.late_move_pruning = state["switches"]
+    engine.transposition_table.generation = state["generation"]
+    engine.killers = state["killers"]
+    engine.history = state["history"]
+    engine.counter_moves = state["counter_moves"]
+    engine.nodes = 0
+    try:
+        return _search_root_moves(engine, board, moves, depth, alpha), engine.nodes
+    except SearchTimeout:
+        return None, engine.nodes
+
+def _smp_worker(board, config, worker_id, stop, results):
+    # Lazy SMP helper process, attaches to the shared table and reports every completed iteration
+    null_move, lmr, lmp = config["switches"]
+    engine = SearchEngine(config["max_depth"], config["max_time"], hash_mb=0, max_nodes=config["max_nodes"],
+                          null_move_pruning=null_move, late_move_reductions=lmr, late_move_pruning=lmp)
+    engine.transposition_table = SharedTranspositionTable(config["hash_mb"], name=config["table"])
+    engine.transposition_table.generation = config["generation"]
+    engine._stop_event = stop
+    engine.time_manager.start(engine.max_time)
+
+    # Diverge from the main process: odd helpers skip depth 1 and each helper starts
+    # with its own history noise so quiet moves are tried in a different order
+    rng = random.Random(worker_id)
+    for table in engine.history:
+        for j in range(4096):
+            table[j] = rng.randrange(256)
+
+    try:
+        for depth, value, pv in engine._deepen(board, 1 + worker_id % 2, config["max_depth"]):
+            results.put((depth, value, pv))
+            if depth == config["max_depth"]:
+                stop.set() # Fixed depth reached, the other processes can stop
+    finally:
+        results.put((None, engine.nodes))
+        engine.transposition_table.close()
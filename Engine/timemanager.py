@@ -0,0 +1,98 @@
+import time
+
+MOVE_OVERHEAD = 0.05 # Seconds kept back for GUI and communication delays
+DEFAULT_MOVES_TO_GO = 30 # Moves the remaining clock is spread over when the GUI does not say
+INCREMENT_USAGE = 0.75 # Share of the increment spent on the current move
+HARD_LIMIT_FACTOR = 3 # The hard limit allows a search to run this many times its soft limit
+MAX_CLOCK_SHARE = 0.5 # Never spend more than this share of the remaining clock on one move
+
+DEFAULT_BRANCHING = 3.0 # Predicted growth from one iteration to the next before two are timed
+MIN_BRANCHING = 1.5
+MAX_BRANCHING = 4.0
+
+INSTABILITY_WEIGHT = 0.5 # Soft limit extension per recent best move change
+INSTABILITY_DECAY = 0.5 # Older best move changes count for less each iteration
+SCORE_DROP = 30 # Centipawns the score must fall between iterations to extend the soft limit
+SCORE_DROP_FACTOR = 1.4
+MAX_EXTENSION = 2.5
+
+class TimeManager:
+    # Decides how long a search may run
+    # soft limit: no new iteration is started after it, stretched while the best move is unstable
+    #             or the score is dropping
+    # hard limit: the search is aborted when it is reached, checked by the search every few nodes
+    def __init__(self):
+        self.start(None)
+
+    def start(self, max_time=None, clock=None):
+        # max_time: fixed seconds for this move, clock: (remaining, increment, moves_to_go) in seconds
+        self.start_time = time.perf_counter()
+        self.soft = self.hard = None
+
+        if clock is not None:
+            remaining, increment, moves_to_go = clock
+            remaining = max(0.0, remaining - MOVE_OVERHEAD)
+            moves_to_go = moves_to_go or DEFAULT_MOVES_TO_GO
+            base = remaining / moves_to_go + increment * INCREMENT_USAGE
+            share = 0.9 if moves_to_go == 1 else MAX_CLOCK_SHARE
+            self.hard = max(0.01, min(base * HARD_LIMIT_FACTOR, remaining * share))
+            self.soft = max(0.01, min(base, self.hard))
+        elif max_time is not None:
+            # A fixed time per move is never exceeded, so both limits are the same
+            self.soft = self.hard = max(0.01, float(max_time))
+
+        self.limited = self.hard is not None
+        self._iteration_start = self.start_time
+        self._iteration_times = []
+        self._best_move = None
+        self._last_score = None
+        self._instability = 0.0
+        self._score_dropped = False
+
+    def restart(self):
+        # Ponderhit: the clock for this move starts now, the iteration history is kept
+        now = time.perf_counter()
+        self._iteration_start += now - self.start_time
+        self.start_time = now
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def hard_expired(self) -> bool:
+        return self.limited and time.perf_counter() - self.start_time >= self.hard
+
+    def iteration_done(self, depth, best_move, score):
+        # Record how long the iteration took and whether the result is settling down
+        now = time.perf_counter()
+        self._iteration_times.append(now - self._iteration_start)
+        self._iteration_start = now
+
+        self._instability *= INSTABILITY_DECAY
+        if self._best_move is not None and best_move != self._best_move:
+            self._instability += 1
+        self._best_move = best_move
+
+        self._score_dropped = self._last_score is not None and score < self._last_score - SCORE_DROP
+        self._last_score = score
+
+    def soft_limit(self) -> float:
+        scale = 1 + self._instability * INSTABILITY_WEIGHT
+        if self._score_dropped:
+            scale *= SCORE_DROP_FACTOR
+        return min(self.hard, self.soft * min(scale, MAX_EXTENSION))
+
+    def should_start_iteration(self) -> bool:
+        # False once past the soft limit, or when the next iteration is predicted to hit the hard limit
+        if not self.limited:
+            return True
+        elapsed = self.elapsed()
+        if elapsed >= self.soft_limit():
+            return False
+        if not self._iteration_times:
+            return True
+
+        last = self._iteration_times[-1]
+        branching = DEFAULT_BRANCHING
+        if len(self._iteration_times) > 1 and self._iteration_times[-2] > 0:
+            branching = min(MAX_BRANCHING, max(MIN_BRANCHING, last / self._iteration_times[-2]))
+        return elapsed + last * branching <= self.hard
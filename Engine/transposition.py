@@ -0,0 +1,164 @@
+from array import array
+from multiprocessing import shared_memory
+
+# Bound types stored with each entry, 0 marks an empty slot
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# Each entry is two 64-bit words: the Zobrist key XORed with the data word, and the packed data word
+# A probe only accepts a slot when key ^ data matches, so an entry torn by two processes writing
+# at once (see SharedTranspositionTable) reads as a miss instead of returning another position's data
+#   bits  0-17  best move (packed move int)
+#   bits 18-24  search depth
+#   bits 25-26  bound
+#   bits 27-31  generation (search counter, used for aging)
+#   bits 32-63  score + SCORE_OFFSET
+ENTRY_BYTES = 16
+SCORE_OFFSET = 1 << 31
+GENERATION_MASK = 31
+
+# Two slots per bucket: slot 0 is depth-preferred, slot 1 is always-replace
+BUCKET_SIZE = 2
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 16):
+        self.resize(size_mb)
+
+    def resize(self, size_mb: float):
+        # Round the bucket count down to a power of two so the index is a mask of the key
+        buckets = max(1, int(size_mb * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SIZE))
+        buckets = 1 << (buckets.bit_length() - 1)
+
+        self.size_mb = size_mb
+        self.mask = buckets - 1
+        self.keys = array("Q", bytes(8 * buckets * BUCKET_SIZE))
+        self.data = array("Q", bytes(8 * buckets * BUCKET_SIZE))
+        self.generation = 0
+        self.reset_stats()
+
+    def clear(self):
+        size = len(self.keys)
+        self.keys = array("Q", bytes(8 * size))
+        self.data = array("Q", bytes(8 * size))
+        self.generation = 0
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0 # Probes where the bucket held other positions but not this one
+        self.stores = 0
+
+    def new_search(self):
+        # Called once per search so entries from earlier searches are replaced first
+        self.generation = (self.generation + 1) & GENERATION_MASK
+
+    def probe(self, key: int):
+        # Returns (depth, bound, score, move) for a verified hit, otherwise None
+        self.probes += 1
+        i = (key & self.mask) * BUCKET_SIZE
+        keys = self.keys
+
+        data = self.data
+
+        d = data[i]
+        if not d or keys[i] ^ d != key:
+            d = data[i + 1]
+            if not d or keys[i + 1] ^ d != key:
+                if data[i] or data[i + 1]:
+                    self.collisions += 1
+                return None
+
+        self.hits += 1
+        return (d >> 18) & 127, (d >> 25) & 3, (d >> 32) - SCORE_OFFSET, d & 0x3FFFF
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: int):
+        i = (key & self.mask) * BUCKET_SIZE
+        keys = self.keys
+        data = self.data
+        self.stores += 1
+
+        d = (move | (depth << 18) | (bound << 25) | (self.generation << 27)
+             | ((int(score) + SCORE_OFFSET) << 32)) # Scores are whole centipawns in the table
+
+        # Depth-preferred slot: take it for the same position, a stale entry, or a search at least as deep
+        old = data[i]
+        same = keys[i] ^ old == key
+        if (same or not old or (old >> 27) & GENERATION_MASK != self.generation
+                or depth >= (old >> 18) & 127):
+            if not same and old:
+                # Demote the displaced entry to the always-replace slot
+                keys[i + 1] = keys[i]
+                data[i + 1] = old
+            keys[i] = key ^ d
+            data[i] = d
+        else:
+            keys[i + 1] = key ^ d
+            data[i + 1] = d
+
+    def hashfull(self) -> int:
+        # Permille of sampled slots filled during the current search, as reported by UCI engines
+        sample = min(1000, len(self.data))
+        generation = self.generation
+        used = 0
+        for d in self.data[:sample]:
+            if d and (d >> 27) & GENERATION_MASK == generation:
+                used += 1
+        return used * 1000 // sample
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+class SharedTranspositionTable(TranspositionTable):
+    # Table held in a multiprocessing.shared_memory block so Lazy SMP workers share one set of entries
+    # Writes are not locked, the key ^ data verification in probe rejects torn entries
+    def __init__(self, size_mb: float = 16, name: str = None):
+        self._shm = None
+        self._owner = name is None # The creating process unlinks the block, workers only attach
+        self._attach_name = name
+        super().__init__(size_mb)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def resize(self, size_mb: float):
+        buckets = max(1, int(size_mb * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SIZE))
+        buckets = 1 << (buckets.bit_length() - 1)
+        slots = buckets * BUCKET_SIZE
+
+        self.close()
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=ENTRY_BYTES * slots)
+            self._shm.buf[:ENTRY_BYTES * slots] = bytes(ENTRY_BYTES * slots)
+        else:
+            self._shm = shared_memory.SharedMemory(name=self._attach_name)
+
+        self._words = self._shm.buf.cast("Q")
+        self.size_mb = size_mb
+        self.mask = buckets - 1
+        self.keys = self._words[:slots]
+        self.data = self._words[slots:2 * slots]
+        self.generation = 0
+        self.reset_stats()
+
+    def clear(self):
+        size = len(self.keys) * ENTRY_BYTES
+        self._shm.buf[:size] = bytes(size)
+        self.generation = 0
+
+    def close(self):
+        # Views into the block must be released before it can be closed
+        if self._shm is None:
+            return
+        self.keys.release()
+        self.data.release()
+        self._words.release()
+        self.keys = self.data = self._words = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,164 @@
+# Bitboard tables and attack generation
+# Squares are indexed as y * 8 + x to match boardList[y][x], so a8 = 0 and h1 = 63
+# A bitboard is a 64-bit integer with bit n set when square n is occupied
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+PIECE_INDEX = {
+    "pawn": PAWN,
+    "knight": KNIGHT,
+    "bishop": BISHOP,
+    "rook": ROOK,
+    "queen": QUEEN,
+    "king": KING,
+}
+
+FULL_BB = (1 << 64) - 1
+
+SQUARE_BB = [1 << sq for sq in range(64)]
+SQUARE_XY = [(sq & 7, sq >> 3) for sq in range(64)]
+
+def _in_bounds(x, y):
+    return 0 <= x <= 7 and 0 <= y <= 7
+
+def _offset_table(offsets):
+    # For each square, the bitboard of squares reachable by a single step offset
+    table = []
+    for sq in range(64):
+        x, y = SQUARE_XY[sq]
+        bb = 0
+        for dx, dy in offsets:
+            if _in_bounds(x + dx, y + dy):
+                bb |= SQUARE_BB[(y + dy) * 8 + x + dx]
+        table.append(bb)
+    return table
+
+KNIGHT_ATTACKS = _offset_table([(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)])
+KING_ATTACKS = _offset_table([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)])
+
+# PAWN_ATTACKS[colour][sq] : squares attacked by a pawn of that colour standing on sq
+# White pawns move towards row 0, black pawns towards row 7
+PAWN_ATTACKS = [
+    _offset_table([(-1, 1), (1, 1)]),   # Black
+    _offset_table([(-1, -1), (1, -1)]), # White
+]
+
+def _ray_table(dx, dy):
+    # For each square, every square along a direction up to the board edge
+    table = []
+    for sq in range(64):
+        x, y = SQUARE_XY[sq]
+        bb = 0
+        x, y = x + dx, y + dy
+        while _in_bounds(x, y):
+            bb |= SQUARE_BB[y * 8 + x]
+            x += dx
+            y += dy
+        table.append(bb)
+    return table
+
+# Positive directions walk towards higher square indices, the nearest blocker is the lowest set bit
+# Negative directions walk towards lower square indices, the nearest blocker is the highest set bit
+RAY_E = _ray_table(1, 0)
+RAY_S = _ray_table(0, 1)
+RAY_SE = _ray_table(1, 1)
+RAY_SW = _ray_table(-1, 1)
+RAY_W = _ray_table(-1, 0)
+RAY_N = _ray_table(0, -1)
+RAY_NW = _ray_table(-1, -1)
+RAY_NE = _ray_table(1, -1)
+
+ROOK_RAYS = [RAY_E[sq] | RAY_S[sq] | RAY_W[sq] | RAY_N[sq] for sq in range(64)]
+BISHOP_RAYS = [RAY_SE[sq] | RAY_SW[sq] | RAY_NW[sq] | RAY_NE[sq] for sq in range(64)]
+
+def rook_attacks(sq: int, occ: int) -> int:
+    # Squares a rook on sq attacks, stopping at (and including) the first blocker on each ray
+    ray = RAY_E[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_E[(b & -b).bit_length() - 1]
+    attacks = ray
+
+    ray = RAY_S[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_S[(b & -b).bit_length() - 1]
+    attacks |= ray
+
+    ray = RAY_W[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_W[b.bit_length() - 1]
+    attacks |= ray
+
+    ray = RAY_N[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_N[b.bit_length() - 1]
+    return attacks | ray
+
+def bishop_attacks(sq: int, occ: int) -> int:
+    # Squares a bishop on sq attacks, stopping at (and including) the first blocker on each ray
+    ray = RAY_SE[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_SE[(b & -b).bit_length() - 1]
+    attacks = ray
+
+    ray = RAY_SW[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_SW[(b & -b).bit_length() - 1]
+    attacks |= ray
+
+    ray = RAY_NW[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_NW[b.bit_length() - 1]
+    attacks |= ray
+
+    ray = RAY_NE[sq]
+    b = ray & occ
+    if b:
+        ray ^= RAY_NE[b.bit_length() - 1]
+    return attacks | ray
+
+def queen_attacks(sq: int, occ: int) -> int:
+    return rook_attacks(sq, occ) | bishop_attacks(sq, occ)
+
+FILE_BB = [sum(SQUARE_BB[y * 8 + x] for y in range(8)) for x in range(8)]
+FILE_A_BB = FILE_BB[0]
+FILE_H_BB = FILE_BB[7]
+
+def pawn_attacks(pawns: int, colour: bool) -> int:
+    # Squares attacked by every pawn in the set at once, white captures towards lower indices
+    if colour:
+        return ((pawns & ~FILE_A_BB) >> 9) | ((pawns & ~FILE_H_BB) >> 7)
+    return (((pawns & ~FILE_A_BB) << 7) | ((pawns & ~FILE_H_BB) << 9)) & FULL_BB
+
+def popcount(bb: int) -> int:
+    return bin(bb).count("1")
+
+def iter_squares(bb: int):
+    # Yield the index of every set bit, lowest first
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+def _between_table():
+    # BETWEEN[a][b] : squares strictly between a and b when they share a rank, file or diagonal, else 0
+    table = [[0] * 64 for _ in range(64)]
+    for sq in range(64):
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+            x, y = SQUARE_XY[sq]
+            x, y = x + dx, y + dy
+            between = 0
+            while _in_bounds(x, y):
+                table[sq][y * 8 + x] = between
+                between |= SQUARE_BB[y * 8 + x]
+                x += dx
+                y += dy
+    return table
+
+BETWEEN = _between_table()
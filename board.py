@@ -1,5 +1,7 @@
-from Engine.pst import ENDGAME_PIECE_SQUARE_TABLE, MIDDLEGAME_PIECE_SQUARE_TABLE
+from Engine.pst import MIDDLEGAME_PST, ENDGAME_PST
 from piece import *
+from bitboard import *
+from zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EP_KEYS
 from collections import defaultdict
 
 def num_to_chess_notation(pos):
@@ -9,7 +11,44 @@ def num_to_chess_notation(pos):
     rank_number = 8 - y
     return f"{file_letter}{rank_number}"
 
+# ---------- Packed Moves ----------
+# Moves are plain ints: bits 0-5 from square, 6-11 to square, 12-14 type of move, 15-17 promotion piece type
+# Squares are indexed y * 8 + x, types are 0=regular, 1=castling, 2=enPassant, 3=Promotion, 4=capture
+MOVE_TYPE_MASK = 7 << 12
+MOVE_CASTLING = 1 << 12
+MOVE_EN_PASSANT = 2 << 12
+MOVE_PROMOTION = 3 << 12
+MOVE_CAPTURE = 4 << 12
+
+PROMOTION_CLASSES = {KNIGHT: Knight, BISHOP: Bishop, ROOK: Rook, QUEEN: Queen}
+
+# Piece values for static exchange evaluation indexed by piece type, the king outweighs any exchange
+SEE_VALUES = [100, 325, 330, 500, 900, 20000]
+
+# Game phase by piece type: 24 with all minor and major pieces on, 0 with only kings and pawns
+PHASE_WEIGHTS = [0, 1, 1, 2, 4, 0]
+PHASE_TOTAL = 24
+
+def encode_move(from_sq: int, to_sq: int, typeOfMove: int = 0, promo: int = 0) -> int:
+    return from_sq | (to_sq << 6) | (typeOfMove << 12) | (promo << 15)
+
+def read_epd(path: str):
+    # Stream (board, operations) pairs from an EPD file, one position per non-empty line
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield Board.from_epd(line)
+
+def move_to_uci(move: int) -> str:
+    # Coordinate notation for a packed move, e.g. e2e4 or e7e8q
+    text = num_to_chess_notation(SQUARE_XY[move & 63]) + num_to_chess_notation(SQUARE_XY[(move >> 6) & 63])
+    if move & MOVE_TYPE_MASK == MOVE_PROMOTION:
+        text += " nbrq"[move >> 15]
+    return text
+
 class Move:
+    # Thin wrapper that decodes a packed integer move for main.Game and the UI
     def __init__(self, oldPos, newPos, piece, piece2=None, typeOfMove=0, promo_piece=None):
         self.oldPos = oldPos
         self.newPos = newPos
@@ -20,6 +59,32 @@ class Move:
         self.piece2NewPos = (-1,-1)
         self.promo_piece = promo_piece
 
+    @property
+    def code(self) -> int:
+        promo = self.promo_piece.type if self.promo_piece is not None else 0
+        return encode_move(self.oldPos[1] * 8 + self.oldPos[0], self.newPos[1] * 8 + self.newPos[0], self.typeOfMove, promo)
+
+    @classmethod
+    def decode(cls, code: int, board: "Board") -> "Move":
+        # Expand a packed move against the board it is about to be played on
+        x1, y1 = SQUARE_XY[code & 63]
+        x2, y2 = SQUARE_XY[(code >> 6) & 63]
+        typeOfMove = (code >> 12) & 7
+        piece = board.boardList[y1][x1]
+
+        move = cls((x1, y1), (x2, y2), piece, board.boardList[y2][x2], typeOfMove)
+        if typeOfMove == 1:
+            rx1, rx2 = (7, 5) if x2 == 6 else (0, 3)
+            move.piece2 = board.boardList[y1][rx1]
+            move.piece2OldPos = (rx1, y1)
+            move.piece2NewPos = (rx2, y1)
+        elif typeOfMove == 2:
+            move.piece2 = board.boardList[y1][x2]
+            move.piece2OldPos = (x2, y1)
+        elif typeOfMove == 3:
+            move.promo_piece = PROMOTION_CLASSES[code >> 15](piece.colour, x2, y2)
+        return move
+
     def __eq__(self, other):
         if self.piece == other.piece and self.oldPos == other.oldPos and self.newPos == other.newPos:
             return True
@@ -28,8 +93,12 @@ class Move:
     def __str__(self):
         return f"Piece: ({self.piece.colour} {self.piece.name}), From: {num_to_chess_notation(self.oldPos)}, To: {num_to_chess_notation(self.newPos)}"
 
+FEN_PIECES = {"p": Pawn, "n": Knight, "b": Bishop, "r": Rook, "q": Queen, "k": King}
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
 class Board:
-    def __init__(self):
+    def __init__(self, fen: str = None):
+        # Starting position by default, otherwise the position described by a FEN string
         self.blackPieces = []
         self.whitePieces = []
 
@@ -46,12 +115,144 @@ class Board:
         self.promotionPiece = None
         self.promotionSquare = None
 
-        self.generate_board()
+        # Reversible state for each made move, preallocated and grown on demand
+        self._undo_stack = [None] * 256
+        self._undo_size = 0
+
+        if fen is None:
+            self.generate_board()
+        else:
+            self._place_fen(fen)
+        self._init_piece_lists()
+        self._init_bitboards()
+        self.castling = self._castling_rights()
+        self.hash_key = self._compute_hash()
+        self.pawn_key = self._compute_pawn_key()
 
         self.position_counts = defaultdict(int)
-        self.position_counts[self.position_key()] = 1
-        self.eval = 0
-        self.mg, self.eg = self.phase_weights()
+        self.position_counts[self.hash_key] = 1
+        self.mg_score, self.eg_score, self.phase = self._compute_eval()
+
+    # ---------- FEN / EPD ----------
+    @classmethod
+    def from_fen(cls, fen: str) -> "Board":
+        return cls(fen)
+
+    @classmethod
+    def from_epd(cls, line: str) -> tuple["Board", dict]:
+        # EPD line: the first four FEN fields followed by operations such as  bm e4; id "name";
+        # Returns the board and a dict of opcode -> operand string
+        fields = line.split(None, 4)
+        if len(fields) < 4:
+            raise ValueError(f"Invalid EPD: {line!r}")
+        operations = {}
+        for op in (fields[4] if len(fields) > 4 else "").split(";"):
+            op = op.strip()
+            if op:
+                opcode, _, operand = op.partition(" ")
+                operations[opcode] = operand.strip().strip('"')
+
+        halfmove = operations.get("hmvc", "0")
+        fullmove = operations.get("fmvn", "1")
+        return cls(" ".join(fields[:4] + [halfmove, fullmove])), operations
+
+    def _place_fen(self, fen: str):
+        # Fill boardList, piece lists, castling flags, side to move, en passant and move counters
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Invalid FEN: {fen!r}")
+        placement, side, rights, ep = fields[:4]
+        if side not in ("w", "b"):
+            raise ValueError(f"Invalid FEN, side to move must be w or b: {fen!r}")
+        if ep != "-" and (len(ep) != 2 or ep[0] not in "abcdefgh" or ep[1] != ("6" if side == "w" else "3")):
+            raise ValueError(f"Invalid FEN, bad en passant square {ep!r}: {fen!r}")
+        halfmove = int(fields[4]) if len(fields) > 4 else 0
+        fullmove = int(fields[5]) if len(fields) > 5 else 1
+
+        rows = placement.split("/")
+        if len(rows) != 8:
+            raise ValueError(f"Invalid FEN: {fen!r}")
+        for y, row in enumerate(rows):
+            x = 0
+            for c in row:
+                if c.isdigit():
+                    x += int(c)
+                    continue
+                if c.lower() not in FEN_PIECES:
+                    raise ValueError(f"Invalid FEN, unknown piece {c!r}: {fen!r}")
+                if x >= 8:
+                    raise ValueError(f"Invalid FEN, rank {8 - y} does not cover 8 files: {fen!r}")
+                piece = FEN_PIECES[c.lower()](c.isupper(), x, y)
+                if hasattr(piece, "hasMoved"):
+                    piece.hasMoved = True # Castling rights below clear the flags still allowed to castle
+                self.boardList[y][x] = piece
+                (self.whitePieces if piece.colour else self.blackPieces).append(piece)
+                if c == "K":
+                    self.whiteKing = piece
+                elif c == "k":
+                    self.blackKing = piece
+                x += 1
+            if x != 8:
+                raise ValueError(f"Invalid FEN, rank {8 - y} does not cover 8 files: {fen!r}")
+
+        if self.whiteKing is None or self.blackKing is None:
+            raise ValueError(f"Invalid FEN, both kings are required: {fen!r}")
+
+        for right, rook_x, row in (("K", 7, 7), ("Q", 0, 7), ("k", 7, 0), ("q", 0, 0)):
+            if right in rights:
+                king = self.boardList[row][4]
+                rook = self.boardList[row][rook_x]
+                if king and king.type == KING and rook and rook.type == ROOK:
+                    king.hasMoved = False
+                    rook.hasMoved = False
+
+        # turn counts plies from the start, its parity is the side to move
+        self.turn = 2 * (fullmove - 1) + (side == "b")
+        self.moveRuleTurns = halfmove
+        self.enPassantTarget = None if ep == "-" else (ord(ep[0]) - 97, 8 - int(ep[1]))
+
+    def to_fen(self) -> str:
+        rows = []
+        for row in self.boardList:
+            text = ""
+            empty = 0
+            for p in row:
+                if p is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = "pnbrqk"[p.type]
+                text += letter.upper() if p.colour else letter
+            if empty:
+                text += str(empty)
+            rows.append(text)
+
+        rights = "".join(c for i, c in enumerate("KQkq") if self.castling >> i & 1) or "-"
+        ep = "-" if self.enPassantTarget is None else num_to_chess_notation(self.enPassantTarget)
+        side = "w" if self.turn % 2 == 0 else "b"
+        return f"{'/'.join(rows)} {side} {rights} {ep} {self.moveRuleTurns} {self.turn // 2 + 1}"
+
+    def _compute_eval(self) -> tuple[int, int, int]:
+        # Middlegame score, endgame score and phase from scratch, what make/unmake maintain incrementally
+        mg = eg = phase = 0
+        for pieceList in (self.whitePieces, self.blackPieces):
+            for p in pieceList:
+                kind = p.type
+                sq = p.pos[1] * 8 + p.pos[0]
+                mg += p.value + MIDDLEGAME_PST[p.colour][kind][sq]
+                eg += p.value + ENDGAME_PST[p.colour][kind][sq]
+        for buckets in self.pieceLists:
+            for kind in (KNIGHT, BISHOP, ROOK, QUEEN):
+                phase += PHASE_WEIGHTS[kind] * len(buckets[kind])
+        return mg, eg, phase
+
+    @property
+    def eval(self) -> int:
+        # Material and piece-square score from white's view, tapered by the game phase
+        phase = min(self.phase, PHASE_TOTAL)
+        return (self.mg_score * phase + self.eg_score * (PHASE_TOTAL - phase)) // PHASE_TOTAL
 
     def generate_board(self):
         WHITE = True
@@ -95,140 +296,126 @@ class Board:
             self.boardList[1][i] = bp
             self.blackPieces.append(bp)
 
-    # ---------- Move Generation ----------
-    def get_pseudo_legal_moves_by_piece(self, piece : Piece) -> list[Move]:
-        moves = []
-        if piece.name == "king":
-            moves = self.basic_moves(piece) + self.castling_moves(piece)
-        elif piece.name == "knight":
-            moves = self.basic_moves(piece)
-        elif piece.name == "rook":
-            moves = self.rook_legal_moves(piece)
-        elif piece.name == "bishop":
-            moves = self.bishop_legal_moves(piece)
-        elif piece.name == "queen":
-            moves = self.queen_legal_moves(piece)
-        elif piece.name == "pawn":
-            moves = self.pawn_legal_moves(piece)
-        return moves
-
-    def rook_legal_moves(self, piece: Piece) -> list[Move]:
-        directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        return self.ray_moves(piece, directions)
-
-    def bishop_legal_moves(self, piece: Piece) -> list[Move]:
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        return self.ray_moves(piece, directions)
-
-    def queen_legal_moves(self, piece: Piece) -> list[Move]:
-        directions = [
-            (1, 0), (-1, 0), (0, 1), (0, -1),
-            (1, 1), (1, -1), (-1, 1), (-1, -1)
-        ]
-        return self.ray_moves(piece, directions)
+    def _init_piece_lists(self):
+        # Per-type buckets pieceLists[colour][type] beside the per-colour lists, every piece records
+        # its index in both so it can be removed in constant time
+        self.pieceLists = [[[] for _ in range(6)], [[] for _ in range(6)]]
+        for pieceList in (self.whitePieces, self.blackPieces):
+            for i, p in enumerate(pieceList):
+                bucket = self.pieceLists[p.colour][p.type]
+                p.listIndex = i
+                p.typeIndex = len(bucket)
+                bucket.append(p)
+
+    def _init_bitboards(self):
+        # Occupancy sets per colour and piece type, indexed [colour][type]
+        self.pieceBB = [[0] * 6, [0] * 6]
+        self.colourBB = [0, 0]
+
+        for pieceList in (self.whitePieces, self.blackPieces):
+            for p in pieceList:
+                bit = SQUARE_BB[p.pos[1] * 8 + p.pos[0]]
+                self.pieceBB[p.colour][p.type] |= bit
+                self.colourBB[p.colour] |= bit
+
+        self.occupied = self.colourBB[0] | self.colourBB[1]
+
+    def _toggle_bb(self, piece, mask):
+        # XOR a piece in or out of the bitboards, mask has one bit per square touched
+        colour = piece.colour
+        self.pieceBB[colour][piece.type] ^= mask
+        self.colourBB[colour] ^= mask
+        self.occupied = self.colourBB[0] | self.colourBB[1]
 
-    def pawn_legal_moves(self, piece: Piece) -> list[Move]:
+    # ---------- Move Generation ----------
+    def get_pseudo_legal_moves_by_piece(self, piece : Piece) -> list[int]:
+        x, y = piece.pos
+        sq = y * 8 + x
+        kind = piece.type
+        if kind == PAWN:
+            return self.pawn_legal_moves(piece)
+        if kind == KNIGHT:
+            return self._target_moves(piece, KNIGHT_ATTACKS[sq])
+        if kind == BISHOP:
+            return self._target_moves(piece, bishop_attacks(sq, self.occupied))
+        if kind == ROOK:
+            return self._target_moves(piece, rook_attacks(sq, self.occupied))
+        if kind == QUEEN:
+            return self._target_moves(piece, queen_attacks(sq, self.occupied))
+        return self._target_moves(piece, KING_ATTACKS[sq]) + self.castling_moves(piece)
+
+    def pawn_legal_moves(self, piece: Piece, mask: int = FULL_BB) -> list[int]:
+        # mask restricts push and capture destinations (pins and check evasion),
+        # en passant is always generated and left to the caller to verify
         moves = []
         x, y = piece.pos
+        sq = y * 8 + x
 
         direction = -1 if piece.colour else 1
         start_row = 6 if piece.colour else 1
         promotion_row = 0 if piece.colour else 7
 
+        # (destination, type of move) pairs before promotions are expanded
+        targets = []
+
         # 1 square forward
-        y1 = y + direction
-        if 0 <= y1 <= 7 and self.boardList[y1][x] is None:
-            moves.append(Move((x, y), (x, y1), piece))
+        to = sq + 8 * direction
+        if not SQUARE_BB[to] & self.occupied:
+            if SQUARE_BB[to] & mask:
+                targets.append((to, 0))
 
             # 2 squares forward
-            y2 = y + 2 * direction
-            if y == start_row and self.boardList[y2][x] is None:
-                moves.append(Move((x, y), (x, y2), piece))
+            to2 = to + 8 * direction
+            if y == start_row and not SQUARE_BB[to2] & self.occupied and SQUARE_BB[to2] & mask:
+                targets.append((to2, 0))
 
         # captures
-        for dx in (-1, 1):
-            x2 = x + dx
-            y2 = y + direction
-            if 0 <= x2 <= 7 and 0 <= y2 <= 7:
-                target = self.boardList[y2][x2]
-                if target is not None and target.colour != piece.colour:
-                    moves.append(Move((x, y), (x2, y2), piece, piece2=target, typeOfMove=4))
-
-        extraPromos = []
-        # promotion flag
-        for m in moves:
-            if m.newPos[1] == promotion_row:
-                m.typeOfMove = 3  # promotion
-                m.promo_piece = Queen(m.piece.colour, m.newPos[0], m.newPos[1])
-                rookPromo = Move(m.oldPos, m.newPos, piece,
-                                 promo_piece=Rook(colour=piece.colour, xpos=m.newPos[0], ypos=m.newPos[1]),
-                                 typeOfMove=3)
-                bishopPromo = Move(m.oldPos, m.newPos, piece,
-                                 promo_piece=Bishop(colour=piece.colour, xpos=m.newPos[0], ypos=m.newPos[1]),
-                                 typeOfMove=3)
-                knightPromo = Move(m.oldPos, m.newPos, piece,
-                                   promo_piece=Knight(colour=piece.colour, xpos=m.newPos[0], ypos=m.newPos[1]),
-                                   typeOfMove=3)
-                extraPromos.extend([rookPromo, bishopPromo, knightPromo])
-
-        moves.extend(extraPromos)
+        captures = PAWN_ATTACKS[piece.colour][sq] & self.colourBB[not piece.colour] & mask
+        while captures:
+            lsb = captures & -captures
+            captures ^= lsb
+            targets.append((lsb.bit_length() - 1, MOVE_CAPTURE))
+
+        for to, flag in targets:
+            if to >> 3 == promotion_row:
+                promo = sq | (to << 6) | MOVE_PROMOTION
+                moves.append(promo | (QUEEN << 15))
+                moves.append(promo | (ROOK << 15))
+                moves.append(promo | (BISHOP << 15))
+                moves.append(promo | (KNIGHT << 15))
+            else:
+                moves.append(sq | (to << 6) | flag)
 
         # en Passant
         if self.enPassantTarget is not None:
             tx, ty = self.enPassantTarget
             pawn = self.boardList[ty-direction][tx]
-            if ty == piece.pos[1] + direction and abs(tx - piece.pos[0]) == 1:
-                if pawn and pawn.colour != piece.colour and pawn.name == "pawn":
-                    m = Move(piece.pos, (tx, ty), piece, piece2=pawn, typeOfMove=2)
-                    m.piece2OldPos = (tx, ty-direction)
-                    moves.append(m)
+            if ty == y + direction and abs(tx - x) == 1:
+                if pawn and pawn.colour != piece.colour and pawn.type == PAWN:
+                    moves.append(sq | ((ty * 8 + tx) << 6) | MOVE_EN_PASSANT)
 
         return moves
 
-    def ray_moves(self, piece: Piece, directions) -> list[Move]:
-        # Generate sliding piece moves in given directions until blocked
-        # For Queens, Rooks, Bishops
+    def _target_moves(self, piece: Piece, targets: int) -> list[int]:
+        # Convert an attack bitboard into packed moves, skipping own pieces and flagging captures
         moves = []
-        x1, y1 = piece.pos
-
-        for dx, dy in directions:
-            x, y = x1 + dx, y1 + dy
-
-            while 0 <= x <= 7 and 0 <= y <= 7:
-                target = self.boardList[y][x]
-
-                # empty square: can move, keep going
-                if target is None:
-                    moves.append(Move((x1, y1), (x, y), piece))
-                else:
-                    # occupied: capture if enemy, then stop
-                    if target.colour != piece.colour:
-                        moves.append(Move((x1, y1), (x, y), piece, piece2=target, typeOfMove=4))
-                    break
-
-                x += dx
-                y += dy
-
+        x, y = piece.pos
+        from_sq = y * 8 + x
+
+        captures = targets & self.colourBB[not piece.colour]
+        quiets = targets & ~self.occupied
+
+        while captures:
+            lsb = captures & -captures
+            captures ^= lsb
+            moves.append(from_sq | ((lsb.bit_length() - 1) << 6) | MOVE_CAPTURE)
+        while quiets:
+            lsb = quiets & -quiets
+            quiets ^= lsb
+            moves.append(from_sq | ((lsb.bit_length() - 1) << 6))
         return moves
 
-    def basic_moves(self, piece: Piece) -> list[Move]:
-        # Convert piece's available squares to Move objects, checking for captures
-        # For Kings and Knights
-        moves = piece.moves_available()
-        legals = []
-        x1 = piece.pos[0]
-        y1 = piece.pos[1]
-        for m in moves:
-            x2 = m[0]
-            y2 = m[1]
-            target = self.boardList[y2][x2]
-            if target is None:
-                legals.append(Move((x1, y1), (x2, y2), piece))
-            elif target.colour != piece.colour:
-                legals.append(Move((x1,y1), (x2,y2), piece, piece2=target, typeOfMove=4))
-        return legals
-
-    def castling_moves(self, piece: Piece) -> list[Move]:
+    def castling_moves(self, piece: Piece) -> list[int]:
         king = piece
         row = 7 if piece.colour else 0
         if king.hasMoved:
@@ -238,49 +425,201 @@ class Board:
         rook2 = self.boardList[row][7] # King side Rook
 
         moves = []
+        king_sq = row * 8 + 4
 
         # Queen Side Castling
-        if rook1 and rook1.name == "rook" and not rook1.hasMoved:
+        if rook1 and rook1.type == ROOK and not rook1.hasMoved:
             empty = self.boardList[row][1] is None and self.boardList[row][2] is None and self.boardList[row][3] is None
             attacked = self.is_square_attacked(4, row, not piece.colour) or self.is_square_attacked(2, row, not piece.colour) or self.is_square_attacked(3, row, not piece.colour)
             if empty and not attacked:
-                move = Move(king.pos, (2, row), king, rook1, 1)
-                move.piece2NewPos = (3, row)
-                move.piece2OldPos = rook1.pos
-                moves.append(move)
+                moves.append(king_sq | ((row * 8 + 2) << 6) | MOVE_CASTLING)
 
         # King Side Castling
-        if rook2 and rook2.name == "rook" and not rook2.hasMoved:
+        if rook2 and rook2.type == ROOK and not rook2.hasMoved:
             empty = self.boardList[row][5] is None and self.boardList[row][6] is None
             attacked = self.is_square_attacked(5, row, not piece.colour) or self.is_square_attacked(6, row, not piece.colour) or self.is_square_attacked(4, row, not piece.colour)
             if empty and not attacked:
-                move = Move(king.pos, (6, row), king, rook2, 1)
-                move.piece2NewPos = (5, row)
-                move.piece2OldPos = rook2.pos
-                moves.append(move)
+                moves.append(king_sq | ((row * 8 + 6) << 6) | MOVE_CASTLING)
 
         return moves
 
-    def get_legal_moves_by_piece(self, piece: Piece):
-        pseudo = self.get_pseudo_legal_moves_by_piece(piece)
-        legal = []
+    def get_legal_moves_by_piece(self, piece: Piece) -> list[int]:
+        checkers, pins = self._checkers_and_pins(piece.colour)
+        if piece.type == KING:
+            return self._king_legal_moves(piece, not checkers)
+
+        if checkers:
+            if checkers & (checkers - 1):
+                return [] # Double check: only the king may move
+            king = self.whiteKing if piece.colour else self.blackKing
+            ksq = king.pos[1] * 8 + king.pos[0]
+            if pins.get(piece.pos[1] * 8 + piece.pos[0]) is not None:
+                return [] # A pinned piece can never resolve a check
+            return self._masked_moves(piece, BETWEEN[ksq][checkers.bit_length() - 1] | checkers)
+
+        return self._masked_moves(piece, pins.get(piece.pos[1] * 8 + piece.pos[0], FULL_BB))
+
+    def generate_legal_moves(self, colour: bool) -> list[int]:
+        # Emits only legal moves: pins and checks are computed once per call instead of
+        # making every pseudo-legal move and testing for check
+        checkers, pins = self._checkers_and_pins(colour)
+        if checkers:
+            return self._generate_evasions(colour, checkers, pins)
 
-        for mv in pseudo:
-            self._apply_temp_move(mv)
-            if not self.in_check(piece.colour):
-                legal.append(mv)
-            self._undo_temp_move(mv)
+        pieceList = self.whitePieces if colour else self.blackPieces
+        moves = []
+        for piece in pieceList:
+            if piece.type == KING:
+                moves += self._king_legal_moves(piece, True)
+            else:
+                moves += self._masked_moves(piece, pins.get(piece.pos[1] * 8 + piece.pos[0], FULL_BB))
+        return moves
 
-        return legal
+    def generate_legal_captures(self, colour: bool) -> list[int]:
+        # Legal captures, en passant and promotions only, for quiescence and the staged move picker
+        checkers, pins = self._checkers_and_pins(colour)
+        if checkers:
+            return [m for m in self._generate_evasions(colour, checkers, pins) if m & MOVE_TYPE_MASK >= MOVE_EN_PASSANT]
 
-    def generate_legal_moves(self, colour: bool):
-        pieceList = self.whitePieces if colour else self.blackPieces
+        enemy = self.colourBB[not colour]
+        promotion_rank = 0xFF if colour else 0xFF << 56
+        buckets = self.pieceLists[colour]
+        moves = []
+        for piece in buckets[PAWN]:
+            # Pushes onto the last rank are promotions, en passant is always generated
+            pin = pins.get(piece.pos[1] * 8 + piece.pos[0], FULL_BB)
+            moves += self._masked_moves(piece, pin & (enemy | promotion_rank))
+        for kind in (KNIGHT, BISHOP, ROOK, QUEEN):
+            for piece in buckets[kind]:
+                moves += self._masked_moves(piece, pins.get(piece.pos[1] * 8 + piece.pos[0], FULL_BB) & enemy)
+        king = self.whiteKing if colour else self.blackKing
+        moves += [m for m in self._king_legal_moves(king, False) if m & MOVE_TYPE_MASK == MOVE_CAPTURE]
+        return moves
+
+    def generate_legal_quiets(self, colour: bool) -> list[int]:
+        # Legal non-capturing, non-promoting moves including castling, the complement of generate_legal_captures
+        checkers, pins = self._checkers_and_pins(colour)
+        if checkers:
+            return [m for m in self._generate_evasions(colour, checkers, pins) if m & MOVE_TYPE_MASK <= MOVE_CASTLING]
+
+        empty = ~self.occupied & FULL_BB
+        promotion_rank = 0xFF if colour else 0xFF << 56
+        buckets = self.pieceLists[colour]
         moves = []
+        for piece in buckets[PAWN]:
+            pin = pins.get(piece.pos[1] * 8 + piece.pos[0], FULL_BB)
+            pawn_moves = self.pawn_legal_moves(piece, pin & empty & ~promotion_rank)
+            if pawn_moves and pawn_moves[-1] & MOVE_TYPE_MASK == MOVE_EN_PASSANT:
+                pawn_moves.pop() # En passant belongs to the captures
+            moves += pawn_moves
+        for kind in (KNIGHT, BISHOP, ROOK, QUEEN):
+            for piece in buckets[kind]:
+                moves += self._masked_moves(piece, pins.get(piece.pos[1] * 8 + piece.pos[0], FULL_BB) & empty)
+        king = self.whiteKing if colour else self.blackKing
+        moves += [m for m in self._king_legal_moves(king, True) if m & MOVE_TYPE_MASK <= MOVE_CASTLING]
+        return moves
+
+    def is_legal_move(self, move: int) -> bool:
+        # Checks a move carried over from another node (hash move) without generating every move
+        s1 = move & 63
+        piece = self.boardList[s1 >> 3][s1 & 7]
+        if piece is None or piece.colour != (self.turn % 2 == 0):
+            return False
+        return move in self.get_legal_moves_by_piece(piece)
+
+    def _generate_evasions(self, colour: bool, checkers: int, pins: dict) -> list[int]:
+        # Moves out of check: king steps, and with a single checker, captures of the checker
+        # or interpositions by unpinned pieces
+        king = self.whiteKing if colour else self.blackKing
+        moves = self._king_legal_moves(king, False)
+
+        if checkers & (checkers - 1):
+            return moves # Double check
+
+        ksq = king.pos[1] * 8 + king.pos[0]
+        mask = BETWEEN[ksq][checkers.bit_length() - 1] | checkers
+        pieceList = self.whitePieces if colour else self.blackPieces
         for piece in pieceList:
-            moves += self.get_legal_moves_by_piece(piece)
+            if piece is king or (piece.pos[1] * 8 + piece.pos[0]) in pins:
+                continue
+            moves += self._masked_moves(piece, mask)
         return moves
 
-    def get_pseudo_legal_moves(self, colour: bool):
+    def _masked_moves(self, piece: Piece, mask: int) -> list[int]:
+        # Legal moves for a non-king piece whose destinations must lie in mask
+        x, y = piece.pos
+        sq = y * 8 + x
+        kind = piece.type
+
+        if kind == PAWN:
+            moves = self.pawn_legal_moves(piece, mask)
+            if self.enPassantTarget is not None and moves and moves[-1] & MOVE_TYPE_MASK == MOVE_EN_PASSANT:
+                # En passant removes two pieces from a rank, verify it by making it
+                ep = moves[-1]
+                self._apply_temp_move(ep)
+                illegal = self.in_check(piece.colour)
+                self._undo_temp_move(ep)
+                if illegal:
+                    moves.pop()
+            return moves
+
+        if kind == KNIGHT:
+            targets = KNIGHT_ATTACKS[sq]
+        elif kind == BISHOP:
+            targets = bishop_attacks(sq, self.occupied)
+        elif kind == ROOK:
+            targets = rook_attacks(sq, self.occupied)
+        else:
+            targets = queen_attacks(sq, self.occupied)
+        return self._target_moves(piece, targets & mask)
+
+    def _king_legal_moves(self, king: Piece, allow_castling: bool) -> list[int]:
+        # King steps to squares not attacked once the king has left its square
+        x, y = king.pos
+        sq = y * 8 + x
+        them = not king.colour
+        occ = self.occupied ^ SQUARE_BB[sq]
+
+        targets = KING_ATTACKS[sq] & ~self.colourBB[king.colour]
+        safe = 0
+        while targets:
+            lsb = targets & -targets
+            targets ^= lsb
+            if not self.attackers_to(lsb.bit_length() - 1, them, occ):
+                safe |= lsb
+
+        moves = self._target_moves(king, safe)
+        if allow_castling:
+            moves += self.castling_moves(king)
+        return moves
+
+    def _checkers_and_pins(self, colour: bool):
+        # Returns a bitboard of pieces giving check to colour's king and a dict mapping
+        # each pinned piece's square to the ray it may still move along (including the pinner)
+        king = self.whiteKing if colour else self.blackKing
+        ksq = king.pos[1] * 8 + king.pos[0]
+        them = not colour
+        occ = self.occupied
+        own = self.colourBB[colour]
+        enemy = self.pieceBB[them]
+
+        checkers = self.attackers_to(ksq, them, occ)
+
+        pins = {}
+        queens = enemy[QUEEN]
+        snipers = (ROOK_RAYS[ksq] & (enemy[ROOK] | queens)) | (BISHOP_RAYS[ksq] & (enemy[BISHOP] | queens))
+        while snipers:
+            lsb = snipers & -snipers
+            snipers ^= lsb
+            ray = BETWEEN[ksq][lsb.bit_length() - 1]
+            blockers = ray & occ
+            # Exactly one blocker, and it is ours
+            if blockers and not (blockers & (blockers - 1)) and blockers & own:
+                pins[blockers.bit_length() - 1] = ray | lsb
+
+        return checkers, pins
+
+    def get_pseudo_legal_moves(self, colour: bool) -> list[int]:
         pieceList = self.whitePieces if colour else self.blackPieces
         moves = []
         for piece in pieceList:
@@ -294,23 +633,24 @@ class Board:
 
         # Validate move against legal moves for that piece
         legal_moves = self.get_legal_moves_by_piece(move.piece)
+        squares = (move.oldPos[1] * 8 + move.oldPos[0]) | ((move.newPos[1] * 8 + move.newPos[0]) << 6)
 
         matched = None
         for m in legal_moves:
-            if m.oldPos == move.oldPos and m.newPos == move.newPos:
+            if m & 0xFFF == squares:
                 matched = m
                 break
 
         if matched is None:
             return "ILLEGAL_MOVE"
 
-        move = matched
-
         # Promotion Moves - Special
-        if move.typeOfMove == 3:
+        if matched & MOVE_TYPE_MASK == MOVE_PROMOTION:
             x1, y1 = move.oldPos
             x2, y2 = move.newPos
 
+            if self.enPassantTarget is not None:
+                self.hash_key ^= EP_KEYS[self.enPassantTarget[0]]
             self.enPassantTarget = None
 
             self.promotionPiece = self.boardList[y1][x1]
@@ -319,7 +659,7 @@ class Board:
             return "PROMOTION"
 
         # All other moves
-        self._apply_temp_move(move)
+        self._apply_temp_move(matched)
 
         return "VALID_MOVE"
 
@@ -348,92 +688,134 @@ class Board:
         captured = self.boardList[y2][x2]
 
         # Update Evaluation
-        promo_delta = 0
-        promo_delta -= pawn.piece_worth()
-        promo_delta += promo.piece_worth()
-        promo_delta -= self.pst_value(pawn, x1, y1)
-        promo_delta += self.pst_value(promo, x2, y2)
+        s1 = y1 * 8 + x1
+        s2 = y2 * 8 + x2
+        kind = promo.type
+        worth = promo.value - pawn.value
+        self.mg_score += worth + MIDDLEGAME_PST[colour][kind][s2] - MIDDLEGAME_PST[colour][PAWN][s1]
+        self.eg_score += worth + ENDGAME_PST[colour][kind][s2] - ENDGAME_PST[colour][PAWN][s1]
+        self.phase += PHASE_WEIGHTS[kind]
         if captured is not None:
-            promo_delta -= captured.piece_worth()
-            promo_delta -= self.pst_value(captured, x2, y2)
+            capType = captured.type
+            self.mg_score -= captured.value + MIDDLEGAME_PST[captured.colour][capType][s2]
+            self.eg_score -= captured.value + ENDGAME_PST[captured.colour][capType][s2]
+            self.phase -= PHASE_WEIGHTS[capType]
 
         self.boardList[y1][x1] = None
         self.boardList[y2][x2] = promo
 
+        h = self.hash_key ^ SIDE_KEY
         self._remove_piece_from_list(pawn)
+        self._toggle_bb(pawn, SQUARE_BB[y1 * 8 + x1])
+        h ^= PIECE_KEYS[colour][PAWN][y1 * 8 + x1]
+        self.pawn_key ^= PIECE_KEYS[colour][PAWN][y1 * 8 + x1]
         if captured is not None:
             self._remove_piece_from_list(captured)
+            self._toggle_bb(captured, SQUARE_BB[y2 * 8 + x2])
+            h ^= PIECE_KEYS[captured.colour][captured.type][y2 * 8 + x2]
         self._add_piece_to_list(promo)
+        self._toggle_bb(promo, SQUARE_BB[y2 * 8 + x2])
+        h ^= PIECE_KEYS[colour][promo.type][y2 * 8 + x2]
+
+        # Promoted rooks never carry castling rights, but capturing a corner rook can remove them
+        castling = self._castling_rights()
+        if castling != self.castling:
+            h ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+            self.castling = castling
+        self.hash_key = h
 
-        self.eval += promo_delta
         self.turn += 1
-        self.position_counts[self.position_key()] += 1
+        self.position_counts[self.hash_key] += 1
 
         self.promotionPiece = None
         self.promotionSquare = None
 
-    def _apply_temp_move(self, move: Move):
-        move._temp_eval_delta = 0
-        move._temp_turn = self.turn
-        self.turn += 1
-
-        move._mg = self.mg
-        move._eg = self.eg
-
-        x1, y1 = move.oldPos
-        x2, y2 = move.newPos
-
-        piece = self.boardList[y1][x1]
-        captured = self.boardList[y2][x2]
+    def _apply_temp_move(self, move: int):
+        s1 = move & 63
+        s2 = (move >> 6) & 63
+        kind = move & MOVE_TYPE_MASK
+        y1, x1 = s1 >> 3, s1 & 7
+        y2, x2 = s2 >> 3, s2 & 7
+
+        boardList = self.boardList
+        piece = boardList[y1][x1]
+        if kind == MOVE_EN_PASSANT:
+            captured = boardList[y1][x2] # Pawn beside the mover, not on the destination
+        else:
+            captured = boardList[y2][x2]
 
-        move._temp_eval_delta -= self.pst_value(piece, x1, y1)
+        # Push everything make cannot recompute on undo
+        i = self._undo_size
+        if i == len(self._undo_stack):
+            self._undo_stack.extend([None] * i)
+        self._undo_stack[i] = (piece, captured, self.enPassantTarget, self.moveRuleTurns, self.hash_key,
+                               self.pawn_key, self.castling, self.mg_score, self.eg_score, self.phase,
+                               getattr(piece, "hasMoved", None))
+        self._undo_size = i + 1
 
-        # save global state
-        move._temp_enPassantTarget = self.enPassantTarget
-        move._temp_moveRuleTurns = self.moveRuleTurns
-        move._temp_captured = captured
-        move._temp_old_pos = piece.pos
-        move._temp_hasMoved = getattr(piece, "hasMoved", None)
+        self.turn += 1
+        colour = piece.colour
+        pieceType = piece.type
+
+        # Incremental middlegame/endgame scores: the moving piece leaves its square
+        mgTable = MIDDLEGAME_PST[colour][pieceType]
+        egTable = ENDGAME_PST[colour][pieceType]
+        mg = self.mg_score - mgTable[s1]
+        eg = self.eg_score - egTable[s1]
+
+        # Incremental Zobrist update: side to move and the moving piece leaving its square
+        h = self.hash_key ^ SIDE_KEY
+        pieceKeys = PIECE_KEYS[colour][pieceType]
+        h ^= pieceKeys[s1]
+        if self.enPassantTarget is not None:
+            h ^= EP_KEYS[self.enPassantTarget[0]]
 
         # update 50-move rule
-        is_pawn_move = (piece.name == "pawn")
-        is_capture = (captured is not None) or (move.typeOfMove == 2)
-        if is_pawn_move or is_capture:
+        is_pawn_move = pieceType == PAWN
+        if is_pawn_move or captured is not None:
             self.moveRuleTurns = 0
         else:
             self.moveRuleTurns += 1
 
         # en passant target
         self.enPassantTarget = None
-        if piece.name == "pawn" and abs(y2 - y1) == 2:
+        if is_pawn_move and abs(y2 - y1) == 2:
             passed_y = (y1 + y2) // 2
             self.enPassantTarget = (x1, passed_y)
+            h ^= EP_KEYS[x1]
 
         # HANDLE PROMOTION FIRST (includes promotion-capture)
-        if move.typeOfMove == 3:
-            promo = move.promo_piece
-            move._temp_pawn_obj = piece
+        if kind == MOVE_PROMOTION:
+            promoType = move >> 15
+            promo = PROMOTION_CLASSES[promoType](colour, x2, y2)
 
-            move._temp_eval_delta += self.pst_value(promo, x2, y2)
-            move._temp_eval_delta -= self.pst_value(piece, x1, y1)
-            move._temp_eval_delta -= piece.piece_worth()
-            move._temp_eval_delta += promo.piece_worth()
+            worth = promo.value - piece.value
+            mg += worth + MIDDLEGAME_PST[colour][promoType][s2]
+            eg += worth + ENDGAME_PST[colour][promoType][s2]
+            self.phase += PHASE_WEIGHTS[promoType]
 
             # Remove pawn from origin square
-            self.boardList[y1][x1] = None
+            boardList[y1][x1] = None
+            self._toggle_bb(piece, SQUARE_BB[s1])
+            self.pawn_key ^= pieceKeys[s1]
 
             # Remove captured piece if it exists
             if captured:
-                move._temp_eval_delta -= captured.piece_worth()
-                move._temp_eval_delta -= self.pst_value(captured, x2, y2)
+                capType = captured.type
+                worth = captured.value
+                mg -= worth + MIDDLEGAME_PST[captured.colour][capType][s2]
+                eg -= worth + ENDGAME_PST[captured.colour][capType][s2]
+                self.phase -= PHASE_WEIGHTS[capType]
                 self._remove_piece_from_list(captured)
+                self._toggle_bb(captured, SQUARE_BB[s2])
+                h ^= PIECE_KEYS[captured.colour][capType][s2]
 
             # Remove pawn from piece list
             self._remove_piece_from_list(piece)
 
             # Place promoted piece on destination
-            self.boardList[y2][x2] = promo
-            promo.pos = (x2, y2)
+            boardList[y2][x2] = promo
+            self._toggle_bb(promo, SQUARE_BB[s2])
 
             # Add promoted piece to list
             self._add_piece_to_list(promo)
@@ -441,263 +823,339 @@ class Board:
             if hasattr(promo, "hasMoved"):
                 promo.hasMoved = True
 
-            self.position_counts[self.position_key()] += 1
+            h ^= PIECE_KEYS[colour][promoType][s2]
+            if captured and capType == ROOK:
+                castling = self._castling_rights()
+                if castling != self.castling:
+                    h ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+                    self.castling = castling
+            self.hash_key = h
 
-            self.eval += move._temp_eval_delta
-            self.mg, self.eg = self.phase_weights()
+            self.position_counts[h] += 1
+
+            self.mg_score = mg
+            self.eg_score = eg
             return  # Exit early for promotions
 
         # NORMAL MOVES (non-promotion)
-        self.boardList[y1][x1] = None
-        move._temp_eval_delta += self.pst_value(piece, x2, y2)
+        boardList[y1][x1] = None
+        mg += mgTable[s2]
+        eg += egTable[s2]
 
         if captured:
+            if kind == MOVE_EN_PASSANT:
+                boardList[y1][x2] = None
+                cap_sq = s1 - x1 + x2
+            else:
+                cap_sq = s2
+            capType = captured.type
             self._remove_piece_from_list(captured)
-            move._temp_eval_delta -= self.pst_value(captured, x2, y2)
-            move._temp_eval_delta -= captured.piece_worth()
-            self.mg, self.eg = self.phase_weights()
-
-        self.boardList[y2][x2] = piece
-        piece.pos = (x2, y2)
+            self._toggle_bb(captured, SQUARE_BB[cap_sq])
+            capKey = PIECE_KEYS[captured.colour][capType][cap_sq]
+            h ^= capKey
+            if capType == PAWN:
+                self.pawn_key ^= capKey
+            worth = captured.value
+            mg -= worth + MIDDLEGAME_PST[captured.colour][capType][cap_sq]
+            eg -= worth + ENDGAME_PST[captured.colour][capType][cap_sq]
+            self.phase -= PHASE_WEIGHTS[capType]
+
+        boardList[y2][x2] = piece
+        piece.pos = SQUARE_XY[s2]
+        self._toggle_bb(piece, SQUARE_BB[s1] | SQUARE_BB[s2])
+        h ^= pieceKeys[s2]
+        if is_pawn_move:
+            self.pawn_key ^= pieceKeys[s1] ^ pieceKeys[s2]
 
         if hasattr(piece, "hasMoved"):
             piece.hasMoved = True
 
-        # Special moves
-        if move.typeOfMove == 1:  # Castling
-            rx1, ry1 = move.piece2OldPos
-            rx2, ry2 = move.piece2NewPos
-            rook = self.boardList[ry1][rx1]
+        # Castling: the rook jumps to the square the king passed over
+        if kind == MOVE_CASTLING:
+            rx1, rx2 = (7, 5) if x2 == 6 else (0, 3)
+            rook = boardList[y1][rx1]
 
-            move._temp_eval_delta += self.pst_value(rook, rx2, ry2)
-            move._temp_eval_delta -= self.pst_value(rook, rx1, ry1)
-            move._temp_rook_pos = rook.pos
-            move._temp_rook_hasMoved = rook.hasMoved
+            mg += MIDDLEGAME_PST[colour][ROOK][y1 * 8 + rx2] - MIDDLEGAME_PST[colour][ROOK][y1 * 8 + rx1]
+            eg += ENDGAME_PST[colour][ROOK][y1 * 8 + rx2] - ENDGAME_PST[colour][ROOK][y1 * 8 + rx1]
 
-            self.boardList[ry1][rx1] = None
-            self.boardList[ry2][rx2] = rook
-            rook.pos = (rx2, ry2)
+            boardList[y1][rx1] = None
+            boardList[y1][rx2] = rook
+            rook.pos = (rx2, y1)
             rook.hasMoved = True
-
-        elif move.typeOfMove == 2:  # En passant
-            px1, py1 = move.piece2OldPos
-            ep_piece = self.boardList[py1][px1]
-
-            move._temp_eval_delta -= self.pst_value(ep_piece, px1, py1)
-            move._temp_eval_delta -= ep_piece.piece_worth()
-            move._temp_en_passant_piece = ep_piece
-
-            self.boardList[py1][px1] = None
-            self._remove_piece_from_list(ep_piece)
-
-        self.position_counts[self.position_key()] += 1
-        self.eval += move._temp_eval_delta
-
-    def _undo_temp_move(self, move: Move):
-        x1, y1 = move.oldPos
-        x2, y2 = move.newPos
-        self.mg = move._mg
-        self.eg = move._eg
-
-        self.eval -= move._temp_eval_delta
-        self.position_counts[self.position_key()] -= 1
-
-        # restore turn
-        self.turn = move._temp_turn
-        del move._temp_turn
-
-        # restore global state
-        self.enPassantTarget = move._temp_enPassantTarget
-        self.moveRuleTurns = move._temp_moveRuleTurns
-        del move._temp_enPassantTarget
-        del move._temp_moveRuleTurns
+            self._toggle_bb(rook, SQUARE_BB[y1 * 8 + rx1] | SQUARE_BB[y1 * 8 + rx2])
+            rookKeys = PIECE_KEYS[rook.colour][ROOK]
+            h ^= rookKeys[y1 * 8 + rx1] ^ rookKeys[y1 * 8 + rx2]
+
+        # Castling rights only change when a king or rook moves or a rook is captured
+        if pieceType == KING or pieceType == ROOK or (captured and capType == ROOK):
+            castling = self._castling_rights()
+            if castling != self.castling:
+                h ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+                self.castling = castling
+        self.hash_key = h
+
+        self.position_counts[h] += 1
+        self.mg_score = mg
+        self.eg_score = eg
+
+    def _undo_temp_move(self, move: int):
+        s1 = move & 63
+        s2 = (move >> 6) & 63
+        kind = move & MOVE_TYPE_MASK
+        y1, x1 = s1 >> 3, s1 & 7
+        y2, x2 = s2 >> 3, s2 & 7
+
+        self.position_counts[self.hash_key] -= 1
+
+        # restore global state from the undo stack
+        self._undo_size -= 1
+        (piece, captured, self.enPassantTarget, self.moveRuleTurns, self.hash_key,
+         self.pawn_key, self.castling, self.mg_score, self.eg_score, self.phase, hasMoved) = self._undo_stack[self._undo_size]
+        self.turn -= 1
+
+        boardList = self.boardList
 
         # Promotion undo (must happen first)
-        if move.typeOfMove == 3:
-            promo_piece = self.boardList[y2][x2]  # Get promoted piece from board
-            pawn = move._temp_pawn_obj
+        if kind == MOVE_PROMOTION:
+            promo_piece = boardList[y2][x2]  # Get promoted piece from board
 
             # Remove promoted piece from list
             self._remove_piece_from_list(promo_piece)
+            self._toggle_bb(promo_piece, SQUARE_BB[s2])
 
             # Restore captured piece on destination (if any)
-            self.boardList[y2][x2] = move._temp_captured
-            if move._temp_captured:
-                self._add_piece_to_list(move._temp_captured)
+            boardList[y2][x2] = captured
+            if captured:
+                self._restore_piece_to_list(captured)
+                self._toggle_bb(captured, SQUARE_BB[s2])
 
             # Restore pawn to origin
-            self.boardList[y1][x1] = pawn
-            pawn.pos = move._temp_old_pos
-
-            # ADD PAWN BACK TO PIECE LIST
-            self._add_piece_to_list(pawn)
-
-            if move._temp_hasMoved is not None:
-                pawn.hasMoved = move._temp_hasMoved
+            boardList[y1][x1] = piece
+            piece.pos = SQUARE_XY[s1]
+            self._toggle_bb(piece, SQUARE_BB[s1])
 
-            # Cleanup
-            del move._temp_pawn_obj
-            del move._temp_captured
-            del move._temp_old_pos
-            del move._temp_hasMoved
+            # Pawn back into the slot it left
+            self._restore_piece_to_list(piece)
             return
 
         # Normal undo (non-promotion)
-        piece = self.boardList[y2][x2]
-
-        self.boardList[y2][x2] = move._temp_captured
-        self.boardList[y1][x1] = piece
-        piece.pos = move._temp_old_pos
-
-        # Restore captured piece back into lists (normal capture)
-        if move._temp_captured:
-            self._add_piece_to_list(move._temp_captured)
+        boardList[y1][x1] = piece
+        piece.pos = SQUARE_XY[s1]
+        self._toggle_bb(piece, SQUARE_BB[s1] | SQUARE_BB[s2])
 
         # Restore hasMoved
-        if move._temp_hasMoved is not None:
-            piece.hasMoved = move._temp_hasMoved
-
-        # Undo special moves
-        if move.typeOfMove == 1:  # Castling
-            rx1, ry1 = move.piece2OldPos
-            rx2, ry2 = move.piece2NewPos
-            rook = self.boardList[ry2][rx2]
-
-            self.boardList[ry2][rx2] = None
-            self.boardList[ry1][rx1] = rook
-            rook.pos = move._temp_rook_pos
-            rook.hasMoved = move._temp_rook_hasMoved
-
-            del move._temp_rook_pos
-            del move._temp_rook_hasMoved
+        if hasMoved is not None:
+            piece.hasMoved = hasMoved
+
+        if kind == MOVE_EN_PASSANT:
+            boardList[y2][x2] = None
+            boardList[y1][x2] = captured
+            self._restore_piece_to_list(captured)
+            self._toggle_bb(captured, SQUARE_BB[s1 - x1 + x2])
+            return
 
-        elif move.typeOfMove == 2:  # En passant
-            px1, py1 = move.piece2OldPos
-            ep_piece = move._temp_en_passant_piece
+        # Restore captured piece back into lists (normal capture)
+        boardList[y2][x2] = captured
+        if captured:
+            self._restore_piece_to_list(captured)
+            self._toggle_bb(captured, SQUARE_BB[s2])
+
+        # Undo castling, the rook had not moved before castling
+        if kind == MOVE_CASTLING:
+            rx1, rx2 = (7, 5) if x2 == 6 else (0, 3)
+            rook = boardList[y1][rx2]
+
+            boardList[y1][rx2] = None
+            boardList[y1][rx1] = rook
+            rook.pos = (rx1, y1)
+            rook.hasMoved = False
+            self._toggle_bb(rook, SQUARE_BB[y1 * 8 + rx1] | SQUARE_BB[y1 * 8 + rx2])
+
+    def make_null_move(self):
+        # Pass the turn without moving, used by null-move pruning
+        # Not counted for repetitions since a null move is never played
+        i = self._undo_size
+        if i == len(self._undo_stack):
+            self._undo_stack.extend([None] * i)
+        self._undo_stack[i] = (None, None, self.enPassantTarget, self.moveRuleTurns, self.hash_key,
+                               self.pawn_key, self.castling, self.mg_score, self.eg_score, self.phase, None)
+        self._undo_size = i + 1
 
-            self.boardList[py1][px1] = ep_piece
-            self._add_piece_to_list(ep_piece)
+        self.turn += 1
+        self.hash_key ^= SIDE_KEY
+        if self.enPassantTarget is not None:
+            self.hash_key ^= EP_KEYS[self.enPassantTarget[0]]
+            self.enPassantTarget = None
 
-            del move._temp_en_passant_piece
+    def undo_null_move(self):
+        self._undo_size -= 1
+        (_, _, self.enPassantTarget, self.moveRuleTurns, self.hash_key,
+         self.pawn_key, self.castling, self.mg_score, self.eg_score, self.phase, _) = self._undo_stack[self._undo_size]
+        self.turn -= 1
 
-        # Cleanup
-        del move._temp_captured
-        del move._temp_old_pos
-        del move._temp_hasMoved
+    def has_non_pawn_material(self, colour: bool) -> bool:
+        # Zugzwang guard: positions with only king and pawns are unsafe for null-move pruning
+        bbs = self.pieceBB[colour]
+        return bool(bbs[KNIGHT] | bbs[BISHOP] | bbs[ROOK] | bbs[QUEEN])
 
     # ---------- Attack Detection ----------
     def is_square_attacked(self, x: int, y: int, by_colour: bool) -> bool:
         # Check if a square is attacked by a given colour
-        def in_bounds(cx, cy):
-            return 0 <= cx <= 7 and 0 <= cy <= 7
-
-        # Pawn attacks
-        pawn_dir = 1 if by_colour else -1
-        for dx in (-1, 1):
-            ax, ay = x + dx, y + pawn_dir
-            if in_bounds(ax, ay):
-                p = self.boardList[ay][ax]
-                if p is not None and p.colour == by_colour and p.name == "pawn":
-                    return True
-
-        # Knight attacks
-        knight_offsets = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
-        for dx, dy in knight_offsets:
-            ax, ay = x + dx, y + dy
-            if in_bounds(ax, ay):
-                p = self.boardList[ay][ax]
-                if p is not None and p.colour == by_colour and p.name == "knight":
-                    return True
+        sq = y * 8 + x
+        bbs = self.pieceBB[by_colour]
 
+        # Pawn attacks: look from the square as if it held a pawn of the other colour
+        if PAWN_ATTACKS[not by_colour][sq] & bbs[PAWN]:
+            return True
+        if KNIGHT_ATTACKS[sq] & bbs[KNIGHT]:
+            return True
         # King Attacks: No castling checks
-        for dx in (-1, 0, 1):
-            for dy in (-1, 0, 1):
-                if dx == 0 and dy == 0:
-                    continue
-                ax, ay = x + dx, y + dy
-                if in_bounds(ax, ay):
-                    p = self.boardList[ay][ax]
-                    if p is not None and p.colour == by_colour and p.name == "king":
-                        return True
-
-        # Rook & Queen Attacks
-        rook_dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        for dx, dy in rook_dirs:
-            ax, ay = x + dx, y + dy
-            while in_bounds(ax, ay):
-                p = self.boardList[ay][ax]
-                if p is None:
-                    ax += dx
-                    ay += dy
-                    continue
-                # First piece on this ray blocks further
-                if p.colour == by_colour and (p.name == "rook" or p.name == "queen"):
-                    return True
+        if KING_ATTACKS[sq] & bbs[KING]:
+            return True
+
+        queens = bbs[QUEEN]
+        sliders = bbs[ROOK] | queens
+        if sliders & ROOK_RAYS[sq] and rook_attacks(sq, self.occupied) & sliders:
+            return True
+        sliders = bbs[BISHOP] | queens
+        if sliders & BISHOP_RAYS[sq] and bishop_attacks(sq, self.occupied) & sliders:
+            return True
+        return False
+
+    def attackers_to(self, sq: int, by_colour: bool, occ: int) -> int:
+        # Bitboard of by_colour's pieces attacking sq, with sliders blocked by occ
+        bbs = self.pieceBB[by_colour]
+        queens = bbs[QUEEN]
+        return ((PAWN_ATTACKS[not by_colour][sq] & bbs[PAWN])
+                | (KNIGHT_ATTACKS[sq] & bbs[KNIGHT])
+                | (KING_ATTACKS[sq] & bbs[KING])
+                | (rook_attacks(sq, occ) & (bbs[ROOK] | queens))
+                | (bishop_attacks(sq, occ) & (bbs[BISHOP] | queens)))
+
+    def see(self, move: int) -> int:
+        # Static exchange evaluation: material the moving side wins (negative if it loses) when both
+        # sides keep recapturing on the destination square with their least valuable attacker
+        s1 = move & 63
+        s2 = (move >> 6) & 63
+        kind = move & MOVE_TYPE_MASK
+        piece = self.boardList[s1 >> 3][s1 & 7]
+        side = piece.colour
+
+        occ = self.occupied ^ SQUARE_BB[s1]
+        if kind == MOVE_EN_PASSANT:
+            gain = [SEE_VALUES[PAWN]]
+            occ ^= SQUARE_BB[(s1 & ~7) | (s2 & 7)]
+        else:
+            captured = self.boardList[s2 >> 3][s2 & 7]
+            gain = [SEE_VALUES[captured.type] if captured else 0]
+
+        # Value of the piece now standing on the square, which the next recapture wins
+        if kind == MOVE_PROMOTION:
+            on_square = SEE_VALUES[move >> 15]
+            gain[0] += on_square - SEE_VALUES[PAWN]
+        else:
+            on_square = SEE_VALUES[piece.type]
+
+        pieceBB = self.pieceBB
+        while True:
+            side = not side
+            # Recomputed each step so sliders behind the last capturer join in (x-rays)
+            attackers = self.attackers_to(s2, side, occ) & occ
+            if not attackers:
                 break
 
-        # Bishop & Queen Attacks
-        bishop_dirs = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        for dx, dy in bishop_dirs:
-            ax, ay = x + dx, y + dy
-            while in_bounds(ax, ay):
-                p = self.boardList[ay][ax]
-                if p is None:
-                    ax += dx
-                    ay += dy
-                    continue
-                if p.colour == by_colour and (p.name == "bishop" or p.name == "queen"):
-                    return True
+            for t in range(6):
+                bb = attackers & pieceBB[side][t]
+                if bb:
+                    break
+
+            # The king may only recapture when the square is no longer defended
+            if t == KING and self.attackers_to(s2, not side, occ ^ bb) & occ:
                 break
-        return False
+
+            gain.append(on_square - gain[-1])
+            occ ^= bb & -bb
+            on_square = SEE_VALUES[t]
+
+        # Each side may stop recapturing when continuing loses material
+        for d in range(len(gain) - 1, 0, -1):
+            gain[d - 1] = -max(-gain[d - 1], gain[d])
+        return gain[0]
 
     def in_check(self, colour: bool):
         king = self.whiteKing if colour else self.blackKing
         return self.is_square_attacked(king.pos[0], king.pos[1], not colour)
 
     # ---------- Piece List Management ----------
+    # Removal moves the last entry of each list into the freed slot, unmake reverses the swap
     def _remove_piece_from_list(self, piece):
         if piece is None:
             return
-        if piece.colour:
-            if piece not in self.whitePieces:
-                print("REMOVE FAIL:", piece.name, piece.pos, "white")
-                print("whitePieces has:", [(p.name, p.pos) for p in self.whitePieces])
-                raise ValueError("Piece not in whitePieces")
-            self.whitePieces.remove(piece)
+        pieceList = self.whitePieces if piece.colour else self.blackPieces
+        i = piece.listIndex
+        if i >= len(pieceList) or pieceList[i] is not piece:
+            raise ValueError(f"{piece.name} at {piece.pos} not in {'white' if piece.colour else 'black'}Pieces")
+        last = pieceList.pop()
+        if last is not piece:
+            pieceList[i] = last
+            last.listIndex = i
+
+        bucket = self.pieceLists[piece.colour][piece.type]
+        last = bucket.pop()
+        if last is not piece:
+            bucket[piece.typeIndex] = last
+            last.typeIndex = piece.typeIndex
+
+    def _restore_piece_to_list(self, piece):
+        # Undo of _remove_piece_from_list: the piece goes back to its old slots and the entries moved
+        # into them return to the end, so unmake leaves both lists in exactly their previous order
+        pieceList = self.whitePieces if piece.colour else self.blackPieces
+        i = piece.listIndex
+        if i < len(pieceList):
+            moved = pieceList[i]
+            moved.listIndex = len(pieceList)
+            pieceList.append(moved)
+            pieceList[i] = piece
         else:
-            if piece not in self.blackPieces:
-                print("REMOVE FAIL:", piece.name, piece.pos, "black")
-                raise ValueError("Piece not in blackPieces")
-            self.blackPieces.remove(piece)
+            pieceList.append(piece)
+
+        bucket = self.pieceLists[piece.colour][piece.type]
+        i = piece.typeIndex
+        if i < len(bucket):
+            moved = bucket[i]
+            moved.typeIndex = len(bucket)
+            bucket.append(moved)
+            bucket[i] = piece
+        else:
+            bucket.append(piece)
 
     def _add_piece_to_list(self, piece):
         if piece is None:
             return
-        if piece.colour:
-            self.whitePieces.append(piece)
-        else:
-            self.blackPieces.append(piece)
+        pieceList = self.whitePieces if piece.colour else self.blackPieces
+        piece.listIndex = len(pieceList)
+        pieceList.append(piece)
+
+        bucket = self.pieceLists[piece.colour][piece.type]
+        piece.typeIndex = len(bucket)
+        bucket.append(piece)
 
     # ---------- Game State ----------
     def game_end(self, moves=None) -> int:
         # 0=Ongoing, 1=checkmate, 2=stalemate, 3=50 move rule draw, 4=3fold repetition
         colour = True if self.turn % 2 == 0 else False
-        pieces = self.whitePieces if colour else self.blackPieces
         king = self.whiteKing if colour else self.blackKing
 
-        if self.position_counts[self.position_key()] >= 3:
+        if self.position_counts[self.hash_key] >= 3:
             return 4
 
         if self.moveRuleTurns >= 50:
             return 3
 
         if moves is None:
-            for piece in pieces:
-                if len(self.get_legal_moves_by_piece(piece)) != 0:
-                    return 0
-        else:
-            if len(moves) != 0:
-                return 0
+            moves = self.generate_legal_moves(colour)
+        if len(moves) != 0:
+            return 0
 
         if self.is_square_attacked(king.pos[0], king.pos[1], not colour):
             return 1
@@ -705,92 +1163,41 @@ class Board:
         return 2
 
     # ---------- Position Hashing ----------
-    def position_key(self) -> bytes:
-        # Stores the position in a bit key, the first bit is the side to move,
-        # The next 4 bits are the castling rights, (white king, white queen, black king, black queen)
-        # The next 8 bits are the target square for en-passant (x, y) - all 1's if it is none
-        # The next 256 bits are the pieces, each mapped to a seperate code, where the first bit is the colour
-
-        MAPPING = {
-            "king": "110",
-            "knight": "101",
-            "queen": "100",
-            "bishop": "011",
-            "rook": "010",
-            "pawn": "001",
-        }
-
-        bits = []
-        append = bits.append
-
-        append("1" if self.turn % 2 == 0 else "0")
-
-        rooks = [self.boardList[7][0], self.boardList[7][7], self.boardList[0][0], self.boardList[0][7]]
-        for rook in rooks:
-            if rook and rook.name == "rook":
-                king = self.whiteKing if rook.colour else self.blackKing
-                if (not rook.hasMoved) and (not king.hasMoved):
-                    append("1")
-                else:
-                    append("0")
-            else:
-                append("0")
-
-        if self.enPassantTarget:
-            x, y = self.enPassantTarget
-            append(format(x, "04b"))
-            append(format(y, "04b"))
-        else:
-            append("11111111")
+    def position_key(self) -> int:
+        # 64-bit Zobrist key of the position, maintained incrementally by make/unmake
+        return self.hash_key
 
+    def _compute_hash(self) -> int:
+        # Build the Zobrist key from scratch: pieces, side to move, castling rights and en-passant file
+        h = 0
         for y in range(8):
             for x in range(8):
                 p = self.boardList[y][x]
-                if p is None:
-                    append("0000")
-                else:
-                    append(("1" if p.colour else "0") + MAPPING[p.name])
-
-        bitstr = "".join(bits)
-
-        pad = (-len(bitstr)) % 8
-        if pad:
-            bitstr += "0" * pad
-
-        return int(bitstr, 2).to_bytes(len(bitstr) // 8, byteorder="big")
-
-    # ---------- Evaluation Helpers ----------
-    def pst_value(self, piece, x: int, y: int) -> int:
-        # Get Piece-Square Table bonus for a given piece at a given position
-        endgame_table = ENDGAME_PIECE_SQUARE_TABLE.get(piece.name)
-        middlegame_table = MIDDLEGAME_PIECE_SQUARE_TABLE.get(piece.name)
-        ty = (7 - y) if piece.colour == WHITE else y
-        bonus = endgame_table[ty][x] * self.eg + middlegame_table[ty][x] * self.mg
-
-        # convert to White POV: black's bonus counts negatively
-        return bonus if piece.colour == WHITE else -bonus
-
-    def phase_weights(self) -> tuple[float, float]:
-        # Calculate middlegame/endgame phase weights based on material
-        mg = 0.0
-
-        for p in self.whitePieces:
-            if p.name == "queen":
-                mg += 0.1666667
-            elif p.name == "rook":
-                mg += 0.0833333
-            elif p.name == "bishop" or p.name == "knight":
-                mg += 0.0416667
-
-        for p in self.blackPieces:
-            if p.name == "queen":
-                mg += 0.1666667
-            elif p.name == "rook":
-                mg += 0.0833333
-            elif p.name == "bishop" or p.name == "knight":
-                mg += 0.0416667
-
-        # mg ∈ [0, 1]
-        if mg > 1.0:
-            mg = 1.0
-        return mg, 1 - mg
\ No newline at end of file
+                if p is not None:
+                    h ^= PIECE_KEYS[p.colour][p.type][y * 8 + x]
+
+        if self.turn % 2 != 0:
+            h ^= SIDE_KEY
+        h ^= CASTLING_KEYS[self.castling]
+        if self.enPassantTarget is not None:
+            h ^= EP_KEYS[self.enPassantTarget[0]]
+        return h
+
+    def _compute_pawn_key(self) -> int:
+        # Zobrist key of the pawns alone, keys the pawn structure cache in evaluation
+        h = 0
+        for colour in (WHITE, BLACK):
+            for sq in iter_squares(self.pieceBB[colour][PAWN]):
+                h ^= PIECE_KEYS[colour][PAWN][sq]
+        return h
+
+    def _castling_rights(self) -> int:
+        # Castling rights bitmask (white king, white queen, black king, black queen),
+        # a right exists while the king and that corner's rook have not moved
+        rights = 0
+        corners = ((self.whiteKing, self.boardList[7][7]), (self.whiteKing, self.boardList[7][0]),
+                   (self.blackKing, self.boardList[0][7]), (self.blackKing, self.boardList[0][0]))
+        for i, (king, rook) in enumerate(corners):
+            if rook and rook.type == ROOK and rook.colour == king.colour and not rook.hasMoved and not king.hasMoved:
+                rights |= 1 << i
+        return rights
@@ -14,6 +14,9 @@ class GameConfig:
     engine_mode: str = "depth" # "depth" or "time"
     depth: int = 4
     time_limit: float = 3 # seconds per move
+    threads: int = 1 # search processes, more than 1 enables Lazy SMP
+    root_workers: int = 1 # depth mode: processes splitting the root moves of the last iteration, 1 for off
+    ponder: bool = True # Human vs engine: search the expected reply while the human thinks
 
 class Button:
     def __init__(self, rect, text, font):
@@ -143,8 +146,9 @@ def run_home_screen(screen, clock) -> GameConfig:
 
     depth_s = Slider(cx - 200, y0 + 3*gap, 400, 1, 8, cfg.depth, font, "Depth", True)
     time_s  = Slider(cx - 200, y0 + 3*gap, 400, 0.1, 5.0, cfg.time_limit, font, "Time (sec)", False)
+    workers_s = Slider(cx - 200, y0 + 3*gap + 72, 400, 1, 8, cfg.root_workers, font, "Root workers", True)
 
-    start_btn = Button((cx - 160, HEIGHT - 140, 320, 70), "START GAME", font)
+    start_btn = Button((cx - 160, HEIGHT - 100, 320, 70), "START GAME", font)
 
     while True:
         clock.tick(FPS)
@@ -162,6 +166,7 @@ def run_home_screen(screen, clock) -> GameConfig:
 
         if mode_t.value == "depth":
             depth_s.draw(screen)
+            workers_s.draw(screen)
         else:
             time_s.draw(screen)
 
@@ -179,13 +184,18 @@ def run_home_screen(screen, clock) -> GameConfig:
             black_t.handle(event)
             mode_t.handle(event)
 
-            (depth_s if mode_t.value == "depth" else time_s).handle(event)
+            if mode_t.value == "depth":
+                depth_s.handle(event)
+                workers_s.handle(event)
+            else:
+                time_s.handle(event)
 
             if start_btn.clicked(event):
                 cfg.white_player = white_t.value
                 cfg.black_player = black_t.value
                 cfg.engine_mode = mode_t.value
                 cfg.depth = depth_s.value
+                cfg.root_workers = workers_s.value
                 cfg.time_limit = time_s.value
                 return cfg
 
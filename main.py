@@ -1,6 +1,9 @@
 from homeScreen import run_home_screen, GameConfig
 import pygame
-from Engine.search import SearchEngine
+import copy
+import threading
+import time
+from Engine.search import SearchEngine, MATE_THRESHOLD
 from board import *
 from piece import *
 
@@ -58,10 +61,23 @@ class Game:
         self.config = config
 
         if self.config.engine_mode == "depth":
-            self.engine = SearchEngine(max_depth=self.config.depth, max_time=None)
+            self.engine = SearchEngine(max_depth=self.config.depth, max_time=None, threads=self.config.threads,
+                                       root_workers=self.config.root_workers)
         else:
-            self.engine = SearchEngine(max_time=self.config.time_limit, max_depth=None)
+            self.engine = SearchEngine(max_time=self.config.time_limit, max_depth=None, threads=self.config.threads)
 
+        # The engine searches a copy of the board on a worker thread, the game loop polls for its move
+        self.engine.on_iteration = self.on_engine_iteration
+        self.search_thread = None
+        self.search_stop = threading.Event()
+        self.search_result = None
+        self.search_start = 0.0
+        self.search_white = True # Side to move in the searched position, for the overlay's score
+        self.analysis = None # (depth, score, best move) of the last completed iteration
+
+        # Pondering: after its move the engine searches the reply it expects on the human's time
+        self.pondering = False
+        self.ponder_key = None # Hash of the position the ponder search assumes
 
     def run(self):
         while self.running:
@@ -70,6 +86,8 @@ class Game:
             self.render()
             self.do_engine_move_if_needed()
 
+        self.abort_search()
+        self.engine.close()
         pygame.quit()
 
     # ---------- Input ----------
@@ -97,11 +115,15 @@ class Game:
                 if sq:
                     self.on_click_square(sq)
 
-            elif event.type == pygame.KEYDOWN and self.game_over:
+            elif event.type == pygame.KEYDOWN and (self.game_over or (self.search_thread is not None and not self.pondering)):
+                # R and ESC also work while the engine is thinking on its own turn, the search is abandoned first
+                # A ponder search runs on the human's turn and does not count as thinking
                 if event.key == pygame.K_ESCAPE:
+                    self.abort_search()
                     self.running = False
 
                 elif event.key == pygame.K_r:
+                    self.abort_search()
                     self.board = Board()
                     self.selected = None
                     self.selected_from = None
@@ -115,7 +137,7 @@ class Game:
         return None
 
     def on_click_square(self, sq):
-        if self.game_over:
+        if self.game_over or self.is_engine_turn():
             return
 
         x, y = sq.col, sq.row  # (col,row)
@@ -188,6 +210,9 @@ class Game:
         self.draw_selection()
         self.draw_pieces()
 
+        if self.search_thread is not None:
+            self.draw_analysis_overlay()
+
         if self.game_over:
             self.draw_game_over_popup()
 
@@ -216,7 +241,8 @@ class Game:
             return
 
         moves = self.board.get_legal_moves_by_piece(p)
-        for move in moves:
+        for code in moves:
+            move = Move.decode(code, self.board)
             x, y = move.newPos[0], move.newPos[1]
             rect = pygame.Rect(x * SQ_SIZE, y * SQ_SIZE, SQ_SIZE, SQ_SIZE)
             if move.typeOfMove == 4 or move.typeOfMove == 2: # Capture and En-Passant
@@ -275,6 +301,29 @@ class Game:
         self.screen.blit(title, title_rect)
         self.screen.blit(hint, hint_rect)
 
+    def draw_analysis_overlay(self):
+        # Live search info: last completed depth, score from white's view, nodes, NPS and best move
+        elapsed = time.perf_counter() - self.search_start
+        nodes = self.engine.nodes
+        nps = int(nodes / elapsed) if elapsed > 0 else 0
+
+        prefix = "Pondering  " if self.pondering else ""
+        if self.analysis is None:
+            text = f"{prefix}Thinking...  Nodes {nodes}  {nps // 1000} kN/s"
+        else:
+            depth, score, best = self.analysis
+            if abs(score) >= MATE_THRESHOLD:
+                evaluation = f"{'+' if score > 0 else '-'}M{(1000000000 - abs(score) + 1) // 2}"
+            else:
+                evaluation = f"{score / 100:+.2f}"
+            text = f"{prefix}Depth {depth}  Eval {evaluation}  Best {best}  Nodes {nodes}  {nps // 1000} kN/s"
+
+        label = self.small_font.render(text, True, (255, 255, 255))
+        box = pygame.Surface((WIDTH, label.get_height() + 12), pygame.SRCALPHA)
+        box.fill((0, 0, 0, 150))
+        self.screen.blit(box, (0, 0))
+        self.screen.blit(label, (8, 6))
+
     def draw_promotion_overlay(self):
         overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 140))
@@ -308,13 +357,88 @@ class Game:
         return self.config.white_player == "engine" if white_to_move else self.config.black_player == "engine"
 
     def do_engine_move_if_needed(self):
+        # Starts a search on the engine's turn and plays its move once the worker thread is done
+        if self.search_thread is not None and self.pondering:
+            if self.game_over:
+                self.abort_search()
+                return
+            if self.promotion_pending_ui or not self.is_engine_turn():
+                return # The human is still thinking
+
+            if self.board.hash_key == self.ponder_key:
+                # Ponder hit: the running search becomes the real one
+                self.engine.ponderhit()
+                self.pondering = False
+                return
+
+            # Ponder miss: drop the search, the transposition table keeps what it learned
+            self.abort_search()
+
+        if self.search_thread is not None:
+            if self.search_thread.is_alive():
+                return
+            self.search_thread = None
+            move = self.search_result
+            if move is not None:
+                self.play_engine_move(move)
+                self.start_pondering()
+            return
+
         if self.game_over or self.promotion_pending_ui:
             return
         if not self.is_engine_turn():
             return
 
-        move = self.engine.choose_move(self.board)
+        # The search makes and unmakes moves, so it must not share the board being drawn
+        self.start_search(copy.deepcopy(self.board))
+
+    def start_search(self, board, ponder=False):
+        self.search_stop.clear()
+        self.search_result = None
+        self.analysis = None
+        self.pondering = ponder
+        self.search_white = board.turn % 2 == 0
+        self.search_start = time.perf_counter()
+        self.engine.prepare_search(self.search_stop, ponder)
+        self.search_thread = threading.Thread(target=self.run_search, args=(board,), daemon=True)
+        self.search_thread.start()
+
+    def start_pondering(self):
+        # Only in human vs engine games, on the position after the reply predicted by the PV
+        if not self.config.ponder or self.game_over:
+            return
+        if (self.config.white_player == "engine") == (self.config.black_player == "engine"):
+            return
+        pv = self.engine.pv
+        if len(pv) < 2:
+            return
+
+        board = copy.deepcopy(self.board)
+        if not board.is_legal_move(pv[1]):
+            return
+        board._apply_temp_move(pv[1])
+        self.ponder_key = board.hash_key
+        self.start_search(board, ponder=True)
+
+    def run_search(self, board):
+        self.search_result = self.engine.choose_move(board)
+
+    def on_engine_iteration(self, depth, value, pv):
+        # Called on the search thread, a single assignment hands the numbers to the render loop
+        score = value if self.search_white else -value
+        self.analysis = (depth, score, move_to_uci(pv[0]))
+
+    def abort_search(self):
+        # Stop a running search and discard its move
+        if self.search_thread is None:
+            return
+        self.search_stop.set()
+        self.search_thread.join()
+        self.search_thread = None
+        self.search_result = None
+        self.pondering = False
 
+    def play_engine_move(self, move):
         # Use _apply_temp_move instead of board.move here to execute an engine move
         # without triggering the UI promotion flow; promotion is handled explicitly
         # engine produced promotion moves will already include promo_piece
@@ -0,0 +1,139 @@
+# Perft: counts the leaf nodes of the move tree to a fixed depth
+# Used to validate move generation against known counts and to benchmark it apart from search
+#   python perft.py --reference                  check every reference position
+#   python perft.py --depth 4 --divide           per-move counts from the start position
+#   python perft.py --fen "<fen>" --depth 3 --hash --workers 4
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board, START_FEN, move_to_uci
+
+# (name, fen, node counts for depth 1, 2, ...)
+REFERENCE_POSITIONS = [
+    ("startpos", START_FEN,
+     [20, 400, 8902, 197281, 4865609]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603]),
+    ("position3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     [14, 191, 2812, 43238, 674624]),
+    ("position4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333]),
+    ("position5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     [44, 1486, 62379, 2103487]),
+]
+
+def perft(board: Board, depth: int, legal: bool = True, table: dict = None) -> int:
+    # Leaf count to depth, legal uses generate_legal_moves with bulk counting at depth 1,
+    # otherwise pseudo-legal moves are made and filtered with in_check
+    # table caches subtree counts by (hash key, depth)
+    if depth == 0:
+        return 1
+
+    if table is not None:
+        cached = table.get((board.hash_key, depth))
+        if cached is not None:
+            return cached
+
+    colour = board.turn % 2 == 0
+    nodes = 0
+    if legal:
+        moves = board.generate_legal_moves(colour)
+        if depth == 1:
+            return len(moves) # Bulk counting: the leaves do not need to be made
+        for move in moves:
+            board._apply_temp_move(move)
+            nodes += perft(board, depth - 1, legal, table)
+            board._undo_temp_move(move)
+    else:
+        for move in board.get_pseudo_legal_moves(colour):
+            board._apply_temp_move(move)
+            if not board.in_check(colour):
+                nodes += perft(board, depth - 1, legal, table)
+            board._undo_temp_move(move)
+
+    if table is not None:
+        table[(board.hash_key, depth)] = nodes
+    return nodes
+
+def _divide_task(board: Board, move: int, depth: int, legal: bool, cached: bool) -> int:
+    # Process pool task: count one root move's subtree
+    board._apply_temp_move(move)
+    return perft(board, depth, legal, {} if cached else None)
+
+def divide(board: Board, depth: int, legal: bool = True, cached: bool = False, workers: int = 1) -> dict:
+    # Leaf count below each root move, keyed by coordinate notation
+    colour = board.turn % 2 == 0
+    if legal:
+        moves = board.generate_legal_moves(colour)
+    else:
+        moves = []
+        for move in board.get_pseudo_legal_moves(colour):
+            board._apply_temp_move(move)
+            if not board.in_check(colour):
+                moves.append(move)
+            board._undo_temp_move(move)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = pool.map(_divide_task, [board] * len(moves), moves, [depth - 1] * len(moves),
+                              [legal] * len(moves), [cached] * len(moves))
+            return dict(zip(map(move_to_uci, moves), counts))
+
+    table = {} if cached else None
+    result = {}
+    for move in moves:
+        board._apply_temp_move(move)
+        result[move_to_uci(move)] = perft(board, depth - 1, legal, table)
+        board._undo_temp_move(move)
+    return result
+
+def run_reference(max_depth: int, legal: bool = True, cached: bool = False, workers: int = 1) -> bool:
+    # Check every reference position up to max_depth, returns False on the first wrong count
+    ok = True
+    for name, fen, counts in REFERENCE_POSITIONS:
+        for depth, expected in enumerate(counts[:max_depth], start=1):
+            start = time.perf_counter()
+            nodes = sum(divide(Board.from_fen(fen), depth, legal, cached, workers).values())
+            duration = time.perf_counter() - start
+            status = "ok" if nodes == expected else f"FAIL (expected {expected})"
+            print(f"{name:<10} depth {depth}: {nodes:>9} nodes {duration:7.2f}s {_nps(nodes, duration):>9} nps  {status}")
+            if nodes != expected:
+                ok = False
+                break
+    return ok
+
+def _nps(nodes: int, duration: float) -> int:
+    return int(nodes / duration) if duration > 0 else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft move generation test and benchmark")
+    parser.add_argument("--fen", default=START_FEN, help="position to count from")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--divide", action="store_true", help="print the count below each root move")
+    parser.add_argument("--pseudo", action="store_true", help="count with pseudo-legal moves and check filtering")
+    parser.add_argument("--hash", action="store_true", help="cache subtree counts by Zobrist key")
+    parser.add_argument("--workers", type=int, default=1, help="processes to split the root moves over")
+    parser.add_argument("--reference", action="store_true", help="check the reference positions up to --depth")
+    args = parser.parse_args()
+
+    legal = not args.pseudo
+    if args.reference:
+        raise SystemExit(0 if run_reference(args.depth, legal, args.hash, args.workers) else 1)
+
+    board = Board.from_fen(args.fen)
+    start = time.perf_counter()
+    counts = divide(board, args.depth, legal, args.hash, args.workers)
+    duration = time.perf_counter() - start
+
+    if args.divide:
+        for move, nodes in counts.items():
+            print(f"{move}: {nodes}")
+    nodes = sum(counts.values())
+    print(f"Nodes: {nodes}")
+    print(f"Time: {duration:.2f}s")
+    print(f"NPS: {_nps(nodes, duration)}")
+
+if __name__ == "__main__":
+    main()
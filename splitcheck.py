@@ -0,0 +1,52 @@
+# Root split check: the split search should pick the same move as the serial search at the same depth
+# Both start every position from a new game, so only the root split itself can make them differ
+#   python splitcheck.py                         depth 4, 2 workers, every reference position
+#   python splitcheck.py --depth 5 --workers 4
+
+import argparse
+import time
+
+from board import Board, move_to_uci
+from Engine.search import SearchEngine
+from perft import REFERENCE_POSITIONS
+
+def _search(engine: SearchEngine, fen: str):
+    # (best move, score, seconds) of one search from a new game
+    scores = []
+    engine.new_game()
+    engine.on_iteration = lambda depth, value, pv: scores.append(value)
+    start = time.perf_counter()
+    move = engine.choose_move(Board.from_fen(fen))
+    return move, scores[-1] if scores else None, time.perf_counter() - start
+
+def run_check(depth: int, workers: int) -> bool:
+    # Compare the serial search (root_workers=1) with the root split on every reference position,
+    # returns False if any best move differs
+    serial = SearchEngine(max_depth=depth, verbose=False)
+    split = SearchEngine(max_depth=depth, root_workers=workers, verbose=False)
+    ok = True
+    try:
+        for name, fen, _ in REFERENCE_POSITIONS:
+            move, score, duration = _search(serial, fen)
+            split_move, split_score, split_duration = _search(split, fen)
+            if split_move != move:
+                status = f"FAIL (split: {move_to_uci(split_move)} {split_score})"
+                ok = False
+            elif split_score != score:
+                status = f"ok, split score {split_score}"
+            else:
+                status = "ok"
+            print(f"{name:<10} depth {depth}: {move_to_uci(move)} {score:>6} {duration:7.2f}s / {split_duration:7.2f}s  {status}")
+    finally:
+        split.close()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the root split search against the serial search")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2, help="root split processes")
+    args = parser.parse_args()
+    raise SystemExit(0 if run_check(args.depth, args.workers) else 1)
+
+if __name__ == "__main__":
+    main()
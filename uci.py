@@ -0,0 +1,224 @@
+# UCI front end: drives SearchEngine over stdin/stdout for GUIs and tournament managers
+#   python uci.py
+# Only the board and engine modules are imported, pygame is never loaded
+
+import sys
+import threading
+import time
+
+from board import Board, move_to_uci
+from Engine.search import SearchEngine, MATE_THRESHOLD, MAX_DEPTH
+
+ENGINE_NAME = "Python Chess Engine"
+ENGINE_AUTHOR = "Parth-Joshi0"
+
+DEFAULT_HASH_MB = 16
+MAX_HASH_MB = 4096
+MAX_THREADS = 64
+DEFAULT_EVAL_CACHE = 1 << 16 # Entries
+MAX_EVAL_CACHE = 1 << 24
+
+class UCIEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self._output_lock = threading.Lock()
+
+        self.engine = SearchEngine(hash_mb=DEFAULT_HASH_MB, verbose=False)
+        self.engine.on_iteration = self._report
+        self.board = Board()
+
+        self._thread = None
+        self._stop = threading.Event()
+        # Infinite and ponder searches may only send bestmove once released by stop or ponderhit
+        self._release = threading.Event()
+        self._search_start = 0.0
+
+    def send(self, text):
+        with self._output_lock:
+            self.output.write(text + "\n")
+            self.output.flush()
+
+    def run(self, input=sys.stdin):
+        for line in input:
+            if not self.handle(line.strip()):
+                break
+        self._stop_search()
+
+    def handle(self, line) -> bool:
+        # Returns False on quit
+        tokens = line.split()
+        if not tokens:
+            return True
+        try:
+            return self._dispatch(tokens)
+        except (ValueError, IndexError) as error:
+            # A malformed command is reported and ignored, the previous position and options are kept
+            self.send(f"info string invalid command '{line}': {error}")
+            return True
+
+    def _dispatch(self, tokens) -> bool:
+        command = tokens[0]
+
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max {MAX_HASH_MB}")
+            self.send(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            self.send(f"option name EvalCache type spin default {DEFAULT_EVAL_CACHE} min 1 max {MAX_EVAL_CACHE}")
+            self.send("option name Ponder type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self._wait_search()
+            self._set_option(tokens)
+        elif command == "ucinewgame":
+            self._wait_search()
+            self.engine.new_game()
+        elif command == "position":
+            self._wait_search()
+            self._set_position(tokens)
+        elif command == "go":
+            self._wait_search()
+            self._go(tokens)
+        elif command == "stop":
+            self._stop_search()
+        elif command == "ponderhit":
+            self._ponderhit()
+        elif command == "quit":
+            return False
+        return True
+
+    # ---------- Commands ----------
+    def _set_option(self, tokens):
+        # setoption name <name> value <value>
+        if "name" not in tokens:
+            return
+        i = tokens.index("name")
+        j = tokens.index("value") if "value" in tokens else len(tokens)
+        name = " ".join(tokens[i + 1:j]).lower()
+        value = " ".join(tokens[j + 1:])
+
+        if name == "hash":
+            self.engine.resize_hash(max(1, min(MAX_HASH_MB, int(value))))
+        elif name == "threads":
+            self.engine.set_threads(max(1, min(MAX_THREADS, int(value))))
+        elif name == "evalcache":
+            self.engine.resize_eval_cache(max(1, min(MAX_EVAL_CACHE, int(value))))
+
+    def _set_position(self, tokens):
+        # position startpos | fen <fen> [moves <move> ...]
+        moves_at = tokens.index("moves") if "moves" in tokens else len(tokens)
+        if len(tokens) > 1 and tokens[1] == "fen":
+            board = Board.from_fen(" ".join(tokens[2:moves_at]))
+        else:
+            board = Board()
+
+        for text in tokens[moves_at + 1:]:
+            move = self._parse_move(board, text)
+            if move is None:
+                self.send(f"info string illegal move {text}")
+                break
+            board._apply_temp_move(move)
+        self.board = board
+
+    def _parse_move(self, board, text):
+        for move in board.generate_legal_moves(board.turn % 2 == 0):
+            if move_to_uci(move) == text:
+                return move
+        return None
+
+    def _go(self, tokens):
+        limits = {}
+        infinite = ponder = False
+        i = 1
+        while i < len(tokens):
+            token = tokens[i]
+            if token == "infinite":
+                infinite = True
+            elif token == "ponder":
+                ponder = True
+            elif token in ("depth", "nodes", "movetime", "wtime", "btime", "winc", "binc", "movestogo"):
+                limits[token] = int(tokens[i + 1])
+                i += 1
+            i += 1
+
+        engine = self.engine
+        engine.max_depth = limits.get("depth", MAX_DEPTH)
+        engine.max_nodes = limits.get("nodes")
+
+        # Infinite searches run without a clock, ponder searches start theirs at ponderhit
+        engine.max_time = engine.clock = None
+        if not infinite:
+            if "movetime" in limits:
+                engine.max_time = limits["movetime"] / 1000
+            else:
+                engine.clock = self._clock(limits)
+        if infinite or ponder:
+            self._release.clear()
+        else:
+            self._release.set()
+
+        self._stop.clear()
+        engine.prepare_search(self._stop, ponder) # Before the thread starts, a ponderhit may follow at once
+        self._search_start = time.perf_counter()
+        self._thread = threading.Thread(target=self._search, args=(self.board,), daemon=True)
+        self._thread.start()
+
+    def _clock(self, limits):
+        # (remaining, increment, moves_to_go) in seconds for the side to move, None without a clock
+        # The time manager turns it into soft and hard limits for this move
+        white = self.board.turn % 2 == 0
+        remaining = limits.get("wtime" if white else "btime")
+        if remaining is None:
+            return None
+        increment = limits.get("winc" if white else "binc", 0)
+        return remaining / 1000, increment / 1000, limits.get("movestogo")
+
+    def _ponderhit(self):
+        # The opponent played the expected move: keep searching, now against the clock
+        self.engine.ponderhit()
+        self._release.set()
+
+    def _stop_search(self):
+        self._stop.set()
+        self._release.set()
+        self._wait_search()
+
+    def _wait_search(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # ---------- Search Thread ----------
+    def _search(self, board):
+        best = self.engine.choose_move(board)
+        self._release.wait()
+
+        if best is None:
+            self.send("bestmove 0000")
+            return
+        pv = self.engine.pv
+        if len(pv) > 1 and pv[0] == best:
+            self.send(f"bestmove {move_to_uci(best)} ponder {move_to_uci(pv[1])}")
+        else:
+            self.send(f"bestmove {move_to_uci(best)}")
+
+    def _report(self, depth, value, pv):
+        elapsed = time.perf_counter() - self._search_start
+        nodes = self.engine.nodes
+        nps = int(nodes / elapsed) if elapsed > 0 else 0
+        hashfull = self.engine.transposition_table.hashfull()
+        self.send(f"info depth {depth} score {format_score(value)} nodes {nodes} nps {nps} "
+                  f"time {int(elapsed * 1000)} hashfull {hashfull} pv {' '.join(move_to_uci(m) for m in pv)}")
+
+def format_score(value) -> str:
+    # UCI score from the side to move's view: centipawns, or moves to mate
+    if value >= MATE_THRESHOLD:
+        return f"mate {(1000000000 - value + 1) // 2}"
+    if value <= -MATE_THRESHOLD:
+        return f"mate -{(1000000000 + value + 1) // 2}"
+    return f"cp {round(value)}"
+
+if __name__ == "__main__":
+    UCIEngine().run()
@@ -0,0 +1,20 @@
+# Zobrist keys for incremental position hashing
+# A position's key is the XOR of one random 64-bit number per feature present:
+# each (colour, piece type, square), black to move, the castling rights and the en-passant file
+
+import random
+
+_rng = random.Random(0x5EED) # Fixed seed so keys are identical across runs and processes
+
+def _rand64():
+    return _rng.getrandbits(64)
+
+# PIECE_KEYS[colour][piece type][square], colour is indexed False=0 (black), True=1 (white)
+PIECE_KEYS = [[[_rand64() for _ in range(64)] for _ in range(6)] for _ in range(2)]
+
+SIDE_KEY = _rand64() # XORed in when black is to move
+
+# One key per castling rights bitmask (white king, white queen, black king, black queen)
+CASTLING_KEYS = [_rand64() for _ in range(16)]
+
+EP_KEYS = [_rand64() for _ in range(8)] # Indexed by en-passant file